@@ -5,7 +5,7 @@ from .models import (
     User, DoctorProfile, PatientProfile, 
     HelpRequest, Prescription, PatientMedicalHistory,
     Symptom, SymptomOption, Suggestion, TimeSlot, Appointment,
-    Notification
+    Notification, HelpRequestDailyStat, WeeklyScheduleRule, SearchTerm
 )
 
 # Register your models here.
@@ -20,5 +20,8 @@ admin.site.register(SymptomOption)
 admin.site.register(Suggestion)
 
 admin.site.register(TimeSlot)
+admin.site.register(WeeklyScheduleRule)
 admin.site.register(Appointment)
-admin.site.register(Notification)
\ No newline at end of file
+admin.site.register(Notification)
+admin.site.register(HelpRequestDailyStat)
+admin.site.register(SearchTerm)
@@ -0,0 +1,76 @@
+# In healthcare_app/assignment.py
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from .models import HelpRequest, DoctorProfile, Notification
+from . import counters
+from . import fragments
+from . import stats
+
+ACTIVE_STATUS = 'In Progress'
+
+
+def auto_assign_enabled():
+    return getattr(settings, 'AUTO_ASSIGN_REQUESTS', False)
+
+
+def claim_request(request_id, doctor):
+    """
+    Atomically moves a Pending request to `doctor`. The claim is a
+    conditional UPDATE, so when several doctors click at once exactly one
+    of them flips the status; the rest get False. Returns True on success.
+    """
+    with transaction.atomic():
+        claimed = HelpRequest.objects.filter(id=request_id, status='Pending').update(
+            doctor=doctor, status=ACTIVE_STATUS
+        )
+        if claimed != 1:
+            return False
+        # update() skips the post_save signals; move the daily-stat bucket
+        # and the workload counters here
+        requested_at, specialty, patient_id = (
+            HelpRequest.objects.values_list('requested_at', 'specialty', 'patient_id').get(id=request_id))
+        day = timezone.localdate(requested_at)
+        stats.record_change((day, specialty, 'Pending'), (day, specialty, ACTIVE_STATUS))
+        counters.record_request_change((patient_id, None, 'Pending'), (patient_id, doctor.pk, ACTIVE_STATUS))
+        # ... and re-render the cached panels that show the status, as
+        # invalidate_request_fragments does. The search index holds only
+        # the request's text, which a claim doesn't change.
+        transaction.on_commit(lambda: fragments.bump(f'request:{request_id}', f'patient:{patient_id}'))
+    return True
+
+
+def doctors_by_load(specialty):
+    """
+    Doctors of `specialty`, least active cases first (ties go to the doctor
+    who joined first), by their active_request_count counter.
+    """
+    return DoctorProfile.objects.filter(specialty=specialty).order_by('active_request_count', 'pk')
+
+
+def auto_assign(request_id):
+    """
+    Routes a new Pending request to the least-loaded doctor of its
+    specialty and notifies them. The chosen doctor row is locked with
+    SKIP LOCKED until their counter has been bumped, so concurrent routings
+    pick different doctors instead of queueing behind one another (and all
+    choosing the same one). Returns
+    the doctor, or None if the request was already taken or nobody is
+    eligible.
+    """
+    specialty = HelpRequest.objects.filter(id=request_id, status='Pending').values_list('specialty', flat=True).first()
+    if specialty is None:
+        return None
+
+    with transaction.atomic():
+        doctor = doctors_by_load(specialty).select_for_update(skip_locked=True, of=('self',)).select_related('user').first()
+        if doctor is None or not claim_request(request_id, doctor):
+            return None
+        Notification.objects.create(
+            user=doctor.user,
+            message=f'A new {specialty} help request has been assigned to you.',
+            link=reverse('request_detail', args=[request_id]),
+        )
+    return doctor
@@ -0,0 +1,44 @@
+# In healthcare_app/auth_cache.py
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+
+def user_cache_timeout():
+    return settings.AUTH_USER_CACHE_TIMEOUT
+
+
+def _cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def load_user(user_id):
+    """
+    The user with `user_id` and their doctor or patient profile, served
+    from the cache when possible. Both profiles are joined in, so
+    `user.doctorprofile` / `user.patientprofile` never cost a query (a
+    missing one raises DoesNotExist as usual). Returns None for an unknown
+    id.
+    """
+    key = _cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = get_user_model().objects.select_related('doctorprofile', 'patientprofile').filter(pk=user_id).first()
+        if user is not None and user_cache_timeout():
+            cache.set(key, user, user_cache_timeout())
+    return user
+
+
+def forget(*user_ids):
+    """
+    Drops the cached copies of these users, now and again when the current
+    transaction commits, so a request racing the commit can't re-cache the
+    old row. Profile primary keys are user ids, so profile ids work too.
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids if user_id is not None]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
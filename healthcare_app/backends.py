@@ -0,0 +1,15 @@
+# In healthcare_app/backends.py
+
+from django.contrib.auth.backends import ModelBackend
+from .auth_cache import load_user
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose per-request user lookup (made by
+    AuthenticationMiddleware for every authenticated request) goes through
+    the cache. Logging in still checks the password against the database.
+    """
+    def get_user(self, user_id):
+        user = load_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
@@ -0,0 +1,326 @@
+# In healthcare_app/benchmarks.py
+
+import json
+import math
+import platform
+import time
+from collections import namedtuple
+from datetime import datetime, time as dt_time, timedelta
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+from .consumers import ChatConsumer
+from .models import User, DoctorProfile, PatientProfile, HelpRequest, TimeSlot, Appointment, ChatMessage, Notification
+
+# One benchmarked request. `role` picks the logged-in user (None for
+# anonymous); `mutates` runs it inside a rolled-back transaction so every
+# iteration sees the same data; `relogin` logs in again before each
+# iteration (for views that end the session); `check`, if given, is
+# called with one unmeasured response and must return True, to catch a
+# scenario that silently measures something other than it claims.
+Scenario = namedtuple('Scenario', ['name', 'role', 'method', 'path', 'data', 'mutates', 'relogin', 'check'])
+Scenario.__new__.__defaults__ = (None, False, False, None)
+
+PERCENTILES = (50, 90, 95, 99)
+CHAT_SCENARIOS = ('ws:chat_connect', 'ws:chat_message')
+
+
+def url_names():
+    """
+    Every named route of the project outside the Django admin, so the suite
+    can tell which ones it doesn't cover yet.
+    """
+    names = set()
+    stack = list(get_resolver().url_patterns)
+    while stack:
+        pattern = stack.pop()
+        if isinstance(pattern, URLPattern):
+            if pattern.name:
+                names.add(pattern.name)
+        elif pattern.app_name != 'admin':
+            stack.extend(pattern.url_patterns)
+    return names
+
+
+class Fixtures:
+    """
+    Picks representative rows to benchmark against: the busiest doctor and
+    patient (the worst case for their dashboards), and one of each object
+    the detail views need. Creates an admin user if there is none.
+    """
+    def __init__(self):
+        self.doctor = (DoctorProfile.objects.annotate(n=Count('helprequest')).order_by('-n', 'pk')
+                       .select_related('user').first())
+        self.patient = (PatientProfile.objects.annotate(n=Count('helprequest')).order_by('-n', 'pk')
+                        .select_related('user').first())
+        if self.doctor is None or self.patient is None:
+            raise ValueError('Need at least one doctor and one patient; seed some data first.')
+
+        self.admin = User.objects.filter(role='admin').order_by('pk').first() or User.objects.create_user(
+            username='bench_admin', password='bench-admin-password', role='admin', is_staff=True)
+        self.help_request = (HelpRequest.objects.filter(doctor=self.doctor).order_by('-pk').first()
+                             or HelpRequest.objects.filter(patient=self.patient).order_by('-pk').first())
+        self.pending_request = HelpRequest.objects.filter(status='Pending', specialty=self.doctor.specialty).order_by('pk').first()
+        self.appointment = Appointment.objects.filter(timeslot__doctor=self.doctor).order_by('-pk').first()
+        self.patient_appointment = Appointment.objects.filter(patient=self.patient).order_by('-pk').first()
+        self.open_slot = TimeSlot.objects.filter(is_booked=False, start_time__gt=timezone.now()).order_by('start_time').first()
+        self.notification = Notification.objects.filter(user=self.patient.user).order_by('-pk').first()
+        attachment = HelpRequest.objects.filter(patient=self.patient).exclude(attachment='').exclude(attachment__isnull=True).first()
+        self.media_path = attachment.attachment.name if attachment else DoctorProfile._meta.get_field('profile_picture').default
+
+    def user(self, role):
+        return {'doctor': self.doctor.user, 'patient': self.patient.user, 'admin': self.admin}.get(role)
+
+
+def _slots_match(date_from, date_to, time_from, time_to):
+    def check(response):
+        starts = [timezone.localtime(datetime.fromisoformat(r['start_time'])) for r in response.json()['results']]
+        return all(date_from <= start.date() <= date_to and time_from <= start.time() < time_to for start in starts)
+    return check
+
+
+def build_scenarios(f):
+    """
+    One scenario per named route. Routes whose sample object doesn't exist
+    in the data set are left out (and reported as not covered).
+    """
+    today = timezone.localdate()
+    search_from, search_to = today + timedelta(days=1), today + timedelta(days=14)
+    afternoon = (dt_time(13), dt_time(16))
+    candidates = [
+        Scenario('index', None, 'get', reverse('index')),
+        Scenario('signup', None, 'get', reverse('signup')),
+        Scenario('login', None, 'get', reverse('login')),
+        Scenario('logout', 'patient', 'post', reverse('logout'), mutates=True, relogin=True),
+        Scenario('admin_dashboard', 'admin', 'get', reverse('admin_dashboard')),
+        Scenario('doctor_dashboard', 'doctor', 'get', reverse('doctor_dashboard')),
+        Scenario('patient_dashboard', 'patient', 'get', reverse('patient_dashboard')),
+        f.help_request and Scenario('request_detail', 'doctor', 'get', reverse('request_detail', args=[f.help_request.pk])),
+        Scenario('case_search', 'doctor', 'get', reverse('case_search'), {'q': 'pain'}),
+        Scenario('quick_help', 'patient', 'get', reverse('quick_help')),
+        Scenario('profile', 'patient', 'get', reverse('profile')),
+        Scenario('profile_edit', 'patient', 'get', reverse('profile_edit')),
+        Scenario('profile_picture_upload', 'patient', 'get', reverse('profile_picture_upload')),
+        f.pending_request and Scenario('assign_request', 'doctor', 'post',
+                                       reverse('assign_request', args=[f.pending_request.pk]), mutates=True),
+        Scenario('manage_schedule', 'doctor', 'get', reverse('manage_schedule')),
+        Scenario('doctor_list', 'patient', 'get', reverse('doctor_list')),
+        Scenario('doctor_schedule', 'patient', 'get', reverse('doctor_schedule', args=[f.doctor.pk])),
+        Scenario('slot_search', 'patient', 'get', reverse('slot_search'), {
+            'specialty': f.doctor.specialty, 'date_from': search_from.isoformat(), 'date_to': search_to.isoformat(),
+            'time_from': afternoon[0].strftime('%H:%M'), 'time_to': afternoon[1].strftime('%H:%M'),
+        }, check=_slots_match(search_from, search_to, *afternoon)),
+        f.open_slot and Scenario('book_appointment', 'patient', 'get',
+                                 reverse('book_appointment', args=[f.open_slot.pk]), mutates=True),
+        f.appointment and Scenario('appointment_detail', 'doctor', 'get', reverse('appointment_detail', args=[f.appointment.pk])),
+        Scenario('appointment_history', 'patient', 'get', reverse('appointment_history')),
+        f.patient_appointment and Scenario('consultation_room', 'patient', 'get',
+                                           reverse('consultation_room', args=[f.patient_appointment.pk])),
+        f.notification and Scenario('mark_notification_as_read', 'patient', 'get',
+                                    reverse('mark_notification_as_read', args=[f.notification.pk]), mutates=True),
+        Scenario('mark_all_notifications_as_read', 'patient', 'post', reverse('mark_all_notifications_as_read'), mutates=True),
+        Scenario('create_doctor', 'admin', 'get', reverse('create_doctor')),
+        Scenario('manage_users', 'admin', 'get', reverse('manage_users')),
+        Scenario('profiling', 'admin', 'get', reverse('profiling')),
+        Scenario('media', 'patient', 'get', reverse('media', args=[f.media_path])),
+        Scenario('password_change', 'patient', 'get', reverse('password_change')),
+        Scenario('password_change_done', 'patient', 'get', reverse('password_change_done')),
+    ]
+    return [s for s in candidates if s]
+
+
+def summarize(latencies, queries, sql_times, statuses):
+    """
+    Latency percentiles (ms, nearest-rank) plus mean query count and SQL time.
+    """
+    ordered = sorted(latencies)
+
+    def rank(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    result = {f'p{p}_ms': round(rank(p) * 1000, 3) for p in PERCENTILES}
+    result.update({
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'queries': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+        'sql_ms': round(sum(sql_times) / len(sql_times) * 1000, 3),
+        'iterations': len(ordered),
+        'statuses': sorted(set(statuses)),
+    })
+    return result
+
+
+def _measure(call):
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        status = call()
+        elapsed = time.perf_counter() - started
+    sql_time = sum(float(q.get('time') or 0) for q in ctx.captured_queries)
+    return elapsed, len(ctx.captured_queries), sql_time, status
+
+
+def requester(scenario, fixtures):
+    """
+    Returns a callable that sends the scenario's request once as its user
+    and returns the response. Mutating requests are rolled back.
+    """
+    client = Client()
+    user = fixtures.user(scenario.role)
+    if user is not None:
+        client.force_login(user)
+
+    def request():
+        if scenario.relogin:
+            client.force_login(user)
+        call = getattr(client, scenario.method)
+        if scenario.mutates:
+            with transaction.atomic():
+                response = call(scenario.path, scenario.data or {})
+                transaction.set_rollback(True)
+        else:
+            response = call(scenario.path, scenario.data or {})
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+        return response
+    return request
+
+
+def run_scenario(scenario, fixtures, iterations, warmup):
+    send = requester(scenario, fixtures)
+    if scenario.check is not None and not scenario.check(send()):
+        raise ValueError(f"Scenario '{scenario.name}' got a response that doesn't match its query.")
+
+    def request():
+        return send().status_code
+
+    for _ in range(warmup):
+        request()
+    samples = [_measure(request) for _ in range(iterations)]
+    return summarize(*zip(*samples))
+
+
+def run_chat(fixtures, iterations, warmup):
+    """
+    Benchmarks ChatConsumer through the Channels communicator: opening a
+    socket (authorization plus the history page) and a message round trip.
+    Messages written by the run are deleted afterwards.
+    """
+    appointment = fixtures.patient_appointment
+    if appointment is None:
+        return {}
+    user = fixtures.patient.user
+    path = f'/ws/chat/{appointment.pk}/'
+    last_id = ChatMessage.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    async def connect():
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), path)
+        communicator.scope['user'] = user
+        communicator.scope['url_route'] = {'kwargs': {'appointment_id': appointment.pk}}
+        connected, _ = await communicator.connect()
+        await communicator.receive_json_from(timeout=5)
+        return communicator, connected
+
+    async def connect_once():
+        communicator, connected = await connect()
+        await communicator.disconnect()
+        return 101 if connected else 403
+
+    async def conversation():
+        # A communicator is bound to the event loop it was started on, so
+        # the whole conversation runs in one coroutine
+        communicator, _ = await connect()
+        latencies = []
+        for i in range(warmup + iterations):
+            started = time.perf_counter()
+            await communicator.send_json_to({'message': 'benchmark ping'})
+            await communicator.receive_json_from(timeout=5)
+            latencies.append(time.perf_counter() - started)
+        await communicator.disconnect()
+        return latencies[warmup:]
+
+    results = {}
+    try:
+        for _ in range(warmup):
+            async_to_sync(connect_once)()
+        samples = [_measure(async_to_sync(connect_once)) for _ in range(iterations)]
+        results['ws:chat_connect'] = summarize(*zip(*samples))
+
+        # Messages are written in buffered batches, so SQL is attributed to
+        # the conversation as a whole and averaged per message
+        with CaptureQueriesContext(connection) as ctx:
+            latencies = async_to_sync(conversation)()
+        sql_time = sum(float(q.get('time') or 0) for q in ctx.captured_queries)
+        per_message = len(ctx.captured_queries) / iterations
+        results['ws:chat_message'] = summarize(
+            latencies, [per_message] * iterations, [sql_time / iterations] * iterations, [200] * iterations)
+    finally:
+        ChatMessage.objects.filter(pk__gt=last_id).delete()
+    return results
+
+
+def run_suite(iterations=20, warmup=2, only=None, log=None):
+    """
+    Runs every scenario and returns the report dict written to disk.
+    `only` optionally restricts the run to some scenario names.
+    Queries are counted on this thread's connection, so the dashboards'
+    queries are run here too (CONCURRENT_QUERIES off) instead of on worker
+    threads, where they would go uncounted.
+    """
+    log = log or (lambda message: None)
+    fixtures = Fixtures()
+    scenarios = [s for s in build_scenarios(fixtures) if not only or s.name in only]
+
+    results = {}
+    with override_settings(CONCURRENT_QUERIES=False):
+        for scenario in scenarios:
+            log(f'  {scenario.name}')
+            results[scenario.name] = run_scenario(scenario, fixtures, iterations, warmup)
+        if not only or set(only) & set(CHAT_SCENARIOS):
+            log('  ws:chat')
+            results.update(run_chat(fixtures, iterations, warmup))
+
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'iterations': iterations,
+            'warmup': warmup,
+            'rows': {
+                'users': User.objects.count(),
+                'help_requests': HelpRequest.objects.count(),
+                'time_slots': TimeSlot.objects.count(),
+                'chat_messages': ChatMessage.objects.count(),
+            },
+            'not_covered': sorted(url_names() - set(results)),
+        },
+        'results': results,
+    }
+
+
+def compare(report, baseline, tolerance=0.2, metric='p95_ms'):
+    """
+    Lists regressions against a saved report: scenarios whose `metric` grew
+    by more than `tolerance` (a fraction) or that now run more queries.
+    """
+    regressions = []
+    for name, current in report['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        if before[metric] and current[metric] > before[metric] * (1 + tolerance):
+            regressions.append(f'{name}: {metric} {before[metric]} -> {current[metric]}')
+        if current['max_queries'] > before['max_queries']:
+            regressions.append(f"{name}: queries {before['max_queries']} -> {current['max_queries']}")
+    return regressions
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
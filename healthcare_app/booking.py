@@ -0,0 +1,69 @@
+# In healthcare_app/booking.py
+
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import TimeSlot
+
+
+def hold_seconds():
+    return getattr(settings, 'SLOT_HOLD_SECONDS', 300)
+
+
+def not_held_by_others(patient, now):
+    """
+    Slots that are free to claim for `patient`: never held, hold expired,
+    or held by this same patient.
+    """
+    return Q(held_until__isnull=True) | Q(held_until__lte=now) | Q(held_by=patient)
+
+
+def hold_slot(slot_id, patient):
+    """
+    Places (or refreshes) a short hold on an open slot so nobody else can
+    book it while `patient` fills in the reason form. Returns True if the
+    patient now holds the slot. Holds are disabled when SLOT_HOLD_SECONDS is 0.
+    The hold is placed when the booking page is shown, so a patient who
+    just looks and leaves keeps the slot for the full TTL unless they
+    cancel, which calls release_hold().
+    """
+    ttl = hold_seconds()
+    if not ttl:
+        return TimeSlot.objects.filter(id=slot_id, is_booked=False).exists()
+
+    now = timezone.now()
+    claimed = TimeSlot.objects.filter(
+        not_held_by_others(patient, now), id=slot_id, is_booked=False
+    ).update(held_by=patient, held_until=now + timedelta(seconds=ttl))
+    return claimed == 1
+
+
+def release_hold(slot_id, patient):
+    """
+    Gives up `patient`'s hold on a slot they decided not to book.
+    """
+    TimeSlot.objects.filter(id=slot_id, held_by=patient, is_booked=False).update(held_by=None, held_until=None)
+
+
+def book_slot(slot_id, patient, appointment):
+    """
+    Atomically claims the slot and saves `appointment` (an unsaved
+    Appointment carrying the patient's reason). The claim is a conditional
+    UPDATE, so of several concurrent requests only one can flip is_booked;
+    the unique timeslot on Appointment backs this up at the database level.
+    Returns the saved appointment, or None if the slot was taken.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = TimeSlot.objects.filter(
+            not_held_by_others(patient, now), id=slot_id, is_booked=False
+        ).update(is_booked=True, held_by=None, held_until=None)
+        if claimed != 1:
+            return None
+
+        appointment.patient = patient
+        appointment.timeslot_id = slot_id
+        appointment.save()
+    return appointment
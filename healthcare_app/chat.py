@@ -0,0 +1,133 @@
+# In healthcare_app/chat.py
+
+import asyncio
+import logging
+from datetime import datetime
+from weakref import WeakKeyDictionary
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from .models import ChatMessage
+from .pagination import encode_cursor, decode_cursor
+
+HISTORY_PAGE_SIZE = 50
+
+# Write-behind buffer: flush after this many messages or this many seconds,
+# whichever comes first
+FLUSH_BATCH_SIZE = 100
+FLUSH_INTERVAL = 0.02
+
+logger = logging.getLogger(__name__)
+
+
+def history_page(appointment_id, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Returns (messages, older_cursor) for a consultation. `messages` are the
+    newest `limit` messages older than `cursor` (or the newest overall), in
+    chronological order. Paging walks (appointment, timestamp, id) backwards
+    with a keyset filter, so only one page is ever loaded into memory.
+    `older_cursor` is None once the start of the transcript is reached.
+    """
+    rows = ChatMessage.objects.filter(appointment_id=appointment_id)
+
+    after = decode_cursor(cursor)
+    if after is not None:
+        try:
+            before_ts, before_id = datetime.fromisoformat(after[0]), int(after[1])
+        except (TypeError, ValueError, IndexError):
+            return [], None
+        rows = rows.filter(Q(timestamp__lt=before_ts) | Q(timestamp=before_ts, id__lt=before_id))
+
+    page = list(
+        rows.order_by('-timestamp', '-id')
+        .values('id', 'message', 'timestamp', 'user__username')[:limit]
+    )
+    older_cursor = None
+    if len(page) == limit:
+        oldest = page[-1]
+        older_cursor = encode_cursor([oldest['timestamp'].isoformat(), oldest['id']])
+
+    messages = [{
+        'message': row['message'],
+        'username': row['user__username'],
+        'timestamp': row['timestamp'].isoformat(),
+    } for row in reversed(page)]
+    return messages, older_cursor
+
+
+class MessageBuffer:
+    """
+    Collects chat messages from every ChatConsumer in this worker and saves
+    them with one bulk INSERT per batch, instead of one INSERT (and thread
+    hop) per message. A batch mixes rooms, so a row that can't be saved
+    (say its appointment was deleted mid-chat) is logged and dropped on its
+    own; flushing never raises into a consumer.
+    """
+    def __init__(self):
+        self.pending = []
+        self.timer = None
+        self.flush_task = None
+        self.lock = asyncio.Lock()
+
+    async def add(self, appointment_id, user_id, message):
+        self.pending.append(ChatMessage(appointment_id=appointment_id, user_id=user_id, message=message))
+        if len(self.pending) >= FLUSH_BATCH_SIZE:
+            await self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(FLUSH_INTERVAL, self._flush_later)
+
+    def _flush_later(self):
+        # Keep a reference so the task isn't collected mid-flight and its
+        # outcome is always retrieved
+        self.timer = None
+        self.flush_task = asyncio.ensure_future(self.flush())
+        self.flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task):
+        if self.flush_task is task:
+            self.flush_task = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('Chat message flush failed', exc_info=task.exception())
+
+    async def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        async with self.lock:
+            batch, self.pending = self.pending, []
+            if not batch:
+                return
+            await sync_to_async(_insert_messages)(batch)
+
+
+def _insert_messages(messages):
+    """
+    Inserts the batch in one statement. If that fails, each row is retried
+    in its own savepoint and only those that still fail are dropped.
+    """
+    try:
+        with transaction.atomic():
+            ChatMessage.objects.bulk_create(messages)
+        return
+    except DatabaseError:
+        logger.warning('Bulk insert of %d chat messages failed; saving them one by one', len(messages), exc_info=True)
+    for message in messages:
+        message.pk = None
+        try:
+            with transaction.atomic():
+                message.save(force_insert=True)
+        except DatabaseError:
+            logger.exception('Dropping chat message for appointment %s', message.appointment_id)
+
+
+_buffers = WeakKeyDictionary()
+
+
+def get_message_buffer():
+    """
+    The buffer for the running event loop (one per Daphne worker).
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _buffers:
+        _buffers[loop] = MessageBuffer()
+    return _buffers[loop]
@@ -0,0 +1,74 @@
+# In healthcare_app/concurrency.py
+
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from . import profiling
+
+
+def concurrent_queries_enabled():
+    return getattr(settings, 'CONCURRENT_QUERIES', False)
+
+
+def _timed(call):
+    started = time.perf_counter()
+    result = call()
+    return result, time.perf_counter() - started
+
+
+def _one_after_another(calls):
+    outcomes = [_timed(call) for call in calls]
+    return [result for result, _ in outcomes], sum(run_time for _, run_time in outcomes)
+
+
+def _on_own_connection(call):
+    """
+    Runs `call` on a worker thread, which has its own database connection.
+    The connection is closed afterwards unless CONN_MAX_AGE keeps it open
+    for the thread's next call, as at the end of a request.
+    """
+    close_old_connections()
+    try:
+        with profiling.recording_queries():
+            return _timed(call)
+    finally:
+        close_old_connections()
+
+
+@sync_to_async
+def _can_use_other_connections():
+    # Other connections can't see this one's uncommitted writes, and SQLite
+    # runs one query at a time whatever the number of connections
+    return connection.vendor != 'sqlite' and not connection.in_atomic_block
+
+
+async def gather(*calls):
+    """
+    Runs each zero-argument sync callable (typically one ORM query) and
+    returns their results in order. With CONCURRENT_QUERIES on they run at
+    the same time on worker threads, so the wait is that of the slowest;
+    otherwise one after another in a single trip to the request's sync
+    thread. Either way the time spent crossing the sync/async boundary is
+    added to the request's profile, if it is being sampled.
+    """
+    started = time.perf_counter()
+    if len(calls) > 1 and concurrent_queries_enabled() and await _can_use_other_connections():
+        outcomes = await asyncio.gather(*(
+            sync_to_async(_on_own_connection, thread_sensitive=False)(call) for call in calls
+        ))
+        results, busy = [result for result, _ in outcomes], max(run_time for _, run_time in outcomes)
+    else:
+        results, busy = await sync_to_async(_one_after_another)(calls)
+    profiling.record_async_calls(len(calls), time.perf_counter() - started - busy)
+    return results
+
+
+async def run(call):
+    """
+    gather() for a single sync call, e.g. rendering a template whose
+    context processors may query.
+    """
+    result, = await gather(call)
+    return result
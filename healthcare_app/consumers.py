@@ -3,8 +3,9 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.utils import timezone
-from .models import Appointment, ChatMessage, User
+from .models import Appointment
 from channels.db import database_sync_to_async
+from .chat import history_page, get_message_buffer
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -12,38 +13,84 @@ class ChatConsumer(AsyncWebsocketConsumer):
         self.room_group_name = f'chat_{self.appointment_id}'
         user = self.scope['user']
 
+        # Authorize once; every later message on this socket is trusted
+        self.authorized = user.is_authenticated and await self.check_authorization(user, self.appointment_id)
+        if not self.authorized:
+            await self.close()
+            return
+
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
         await self.accept()
+        # Send the latest page of the transcript so a reconnect keeps context
+        await get_message_buffer().flush()
+        await self.send_history()
 
     async def disconnect(self, close_code):
+        if not getattr(self, 'authorized', False):
+            return
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        await get_message_buffer().flush()
     async def receive(self, text_data):
         text_data_json = json.loads(text_data)
+        if text_data_json.get('action') == 'load_older':
+            await self.send_history(text_data_json.get('cursor'))
+            return
         message = text_data_json['message']
         user = self.scope['user']
-        await self.save_message(user, self.appointment_id, message)
+        # Saved in the next bulk write instead of one INSERT per message
+        await get_message_buffer().add(self.appointment_id, user.id, message)
         await self.channel_layer.group_send(self.room_group_name,{'type': 'chat_message','message': message,'username': user.username})
     async def chat_message(self, event):
         message = event['message']
         username = event['username']
         await self.send(text_data=json.dumps({'message': message,'username': username}))
-    @database_sync_to_async
-    def check_authorization(self, user, appointment_id):
- 
+    async def send_history(self, cursor=None):
+        messages, older_cursor = await database_sync_to_async(history_page)(self.appointment_id, cursor)
+        await self.send(text_data=json.dumps({'type': 'history', 'messages': messages, 'older_cursor': older_cursor}))
+    async def check_authorization(self, user, appointment_id):
+        """
+        True if `user` is the patient or the doctor of the appointment.
+        Profiles share their user's primary key, so no profile rows are loaded.
+        """
         try:
-            appointment = Appointment.objects.select_related('timeslot', 'patient__user', 'timeslot__doctor__user').get(id=appointment_id)
-            
-            if user.role == 'patient' and appointment.patient.user == user:
-                return True, appointment
-            if user.role == 'doctor' and appointment.timeslot.doctor.user == user:
-                return True, appointment
+            appointment = await Appointment.objects.select_related('timeslot').aget(id=appointment_id)
         except Appointment.DoesNotExist:
-            return False, None
-        return False, None
-    @database_sync_to_async
-    def save_message(self, user, appointment_id, message):
-        appointment = Appointment.objects.get(id=appointment_id)
-        ChatMessage.objects.create(user=user, appointment=appointment, message=message)
\ No newline at end of file
+            return False
+        if user.role == 'patient':
+            return appointment.patient_id == user.id
+        if user.role == 'doctor':
+            return appointment.timeslot.doctor_id == user.id
+        return False
+
+def notification_group_name(user_id):
+    return f'notifications_{user_id}'
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    One socket per logged-in browser tab, joined to a per-user group. New
+    notifications are pushed here as they are created, so open dashboards
+    don't have to be reloaded to see them.
+    """
+    async def connect(self):
+        user = self.scope['user']
+        if not user.is_authenticated:
+            await self.close()
+            return
+
+        self.group_name = notification_group_name(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def notification_message(self, event):
+        await self.send(text_data=json.dumps({
+            'id': event['id'],
+            'message': event['message'],
+            'link': event['link'],
+        }))
@@ -1,11 +1,10 @@
-from .models import Notification
+from .notifications import get_unread_summary
 
 def notifications(request):
     if request.user.is_authenticated:
-        unread_notifications = request.user.notifications.filter(is_read=False)
-        unread_count = unread_notifications.count()
+        unread_count, unread_notifications = get_unread_summary(request.user.pk)
         return {
             'unread_notifications': unread_notifications,
             'unread_count': unread_count,
         }
-    return {}
\ No newline at end of file
+    return {}
@@ -0,0 +1,129 @@
+# In healthcare_app/counters.py
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from . import auth_cache
+from .importing import batched
+from .models import Appointment, DoctorProfile, HelpRequest, PatientProfile, TimeSlot
+
+# HelpRequest status -> counter field, per profile. A doctor's "pending"
+# work is the whole specialty queue, not something they own, so doctors
+# only count the requests assigned to them.
+PATIENT_REQUEST_COUNTERS = {
+    'Pending': 'pending_request_count',
+    'In Progress': 'active_request_count',
+    'Answered': 'answered_request_count',
+}
+DOCTOR_REQUEST_COUNTERS = {
+    'In Progress': 'active_request_count',
+    'Answered': 'answered_request_count',
+}
+# Appointments still to take place (not yet completed)
+BOOKED_COUNTER = 'booked_appointment_count'
+REPAIR_BATCH_SIZE = 1000
+
+
+def request_key(help_request):
+    return (help_request.patient_id, help_request.doctor_id, help_request.status)
+
+
+def appointment_key(appointment):
+    return (appointment.patient_id, appointment.timeslot_id, appointment.status)
+
+
+def _bump(model, pk, field, delta):
+    model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+    # The profile travels with its cached user (profile pk == user id)
+    auth_cache.forget(pk)
+
+
+def _request_deltas(key, sign):
+    patient_id, doctor_id, status = key
+    if status in PATIENT_REQUEST_COUNTERS:
+        yield PatientProfile, patient_id, PATIENT_REQUEST_COUNTERS[status], sign
+    if doctor_id is not None and status in DOCTOR_REQUEST_COUNTERS:
+        yield DoctorProfile, doctor_id, DOCTOR_REQUEST_COUNTERS[status], sign
+
+
+def record_request_change(old_key, new_key):
+    """
+    Moves one help request's contribution from the (patient, doctor, status)
+    `old_key` to `new_key`; either may be None for a create or a delete.
+    The counters are bumped with F() expressions from post_save, which
+    runs outside any transaction of its own: callers changing a status
+    wrap the save in transaction.atomic() so the bumps commit or roll back
+    with it.
+    """
+    if old_key == new_key:
+        return
+    deltas = {}
+    for key, sign in ((old_key, -1), (new_key, 1)):
+        if key is not None:
+            for model, pk, field, delta in _request_deltas(key, sign):
+                deltas[model, pk, field] = deltas.get((model, pk, field), 0) + delta
+    for (model, pk, field), delta in deltas.items():
+        if delta:
+            _bump(model, pk, field, delta)
+
+
+def record_appointment_change(old_key, new_key):
+    """
+    Same as record_request_change, for the booked-appointment counters of
+    the patient and of the doctor who owns the time slot.
+    """
+    was_booked = old_key is not None and old_key[2] == 'Booked'
+    is_booked = new_key is not None and new_key[2] == 'Booked'
+    if old_key == new_key or (not was_booked and not is_booked):
+        return
+    for key, delta in ((old_key, -1 if was_booked else 0), (new_key, 1 if is_booked else 0)):
+        if delta:
+            patient_id, timeslot_id, _ = key
+            _bump(PatientProfile, patient_id, BOOKED_COUNTER, delta)
+            doctor_id = TimeSlot.objects.filter(pk=timeslot_id).values_list('doctor_id', flat=True).first()
+            if doctor_id is not None:
+                _bump(DoctorProfile, doctor_id, BOOKED_COUNTER, delta)
+
+
+def _count(queryset, outer_field):
+    """
+    A correlated COUNT(*) of `queryset` rows pointing at the outer profile.
+    """
+    counted = queryset.filter(**{outer_field: OuterRef('pk')}).order_by().values(outer_field).annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def expected_counters():
+    """
+    {profile model: {counter field: expression recomputing it from the
+    source tables}}.
+    """
+    booked = Appointment.objects.filter(status='Booked')
+    patient = {field: _count(HelpRequest.objects.filter(status=status), 'patient')
+               for status, field in PATIENT_REQUEST_COUNTERS.items()}
+    patient[BOOKED_COUNTER] = _count(booked, 'patient')
+    doctor = {field: _count(HelpRequest.objects.filter(status=status), 'doctor')
+              for status, field in DOCTOR_REQUEST_COUNTERS.items()}
+    doctor[BOOKED_COUNTER] = _count(booked, 'timeslot__doctor')
+    return {PatientProfile: patient, DoctorProfile: doctor}
+
+
+def repair():
+    """
+    Recomputes every counter that has drifted from the source tables (e.g.
+    after bulk inserts, which skip the signals). Returns the number of
+    profiles that were corrected.
+    """
+    fixed = 0
+    with transaction.atomic():
+        for model, counters in expected_counters().items():
+            expected = {f'expected_{field}': expression for field, expression in counters.items()}
+            drifted = Q()
+            for field in counters:
+                drifted |= ~Q(**{field: F(f'expected_{field}')})
+            stale = list(model.objects.annotate(**expected).filter(drifted).values_list('pk', flat=True))
+            for batch in batched(stale, REPAIR_BATCH_SIZE):
+                model.objects.filter(pk__in=batch).update(**counters)
+                fixed += len(batch)
+            auth_cache.forget(*stale)
+    return fixed
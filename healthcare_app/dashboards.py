@@ -0,0 +1,129 @@
+# In healthcare_app/dashboards.py
+
+from . import concurrency
+from . import stats
+from .models import User, HelpRequest, PatientMedicalHistory, Appointment
+from .pagination import paginate
+
+# Sort keys of the paginated panels; the trailing id makes each one unique.
+# Each matches the tail of an index after the panel's equality filters.
+ANSWERED_ORDERING = ('-requested_at', '-id')
+PENDING_ORDERING = ('requested_at', 'id')
+REQUESTS_ORDERING = ('-requested_at', '-id')
+HISTORY_ORDERING = ('-recorded_at', '-id')
+
+
+def _start_of_day(now):
+    return now.replace(hour=0, minute=0, second=0)
+
+
+def _doctor_panels(doctor_profile, now, answered_cursor, pending_cursor):
+    """
+    {context key: callable running that panel's query}. The queries don't
+    depend on each other, so they can run in any order or all at once.
+    """
+    upcoming_appointments = (
+        Appointment.objects.filter(
+            timeslot__doctor=doctor_profile,
+            timeslot__start_time__gte=_start_of_day(now), # Get all from today
+            status='Booked'
+        ).select_related('timeslot', 'patient__user').order_by('timeslot__start_time')
+    )
+    pending_requests = HelpRequest.objects.filter(status='Pending', specialty=doctor_profile.specialty)
+    active_requests = (
+        HelpRequest.objects.filter(doctor=doctor_profile, status='In Progress')
+        .select_related('patient__user').order_by('requested_at')
+    )
+    # Answering a request always writes its prescription first
+    answered = HelpRequest.objects.filter(doctor=doctor_profile, status='Answered', prescription__isnull=False)
+    return {
+        'upcoming_appointments': lambda: list(upcoming_appointments),
+        'pending_requests': lambda: paginate(
+            pending_requests.select_related('patient__user'), PENDING_ORDERING, pending_cursor
+        ),
+        # The whole queue, not just the page; read from the daily stats
+        'pending_count': lambda: stats.status_totals(doctor_profile.specialty).get('Pending', 0),
+        'active_requests': lambda: list(active_requests),
+        'answered_requests': lambda: paginate(
+            answered.select_related('patient__user', 'prescription'), ANSWERED_ORDERING, answered_cursor
+        ),
+    }
+
+
+def _doctor_context(doctor_profile, now, panels):
+    return {
+        **panels,
+        'active_count': len(panels['active_requests']),
+        'answered_by_me_count': doctor_profile.answered_request_count,
+        'now': now,
+    }
+
+
+async def aload_doctor_dashboard(doctor_profile, now, answered_cursor=None, pending_cursor=None):
+    """
+    Builds every panel of the doctor dashboard in a fixed number of queries,
+    run through concurrency.gather. Each list pulls the rows the template
+    walks (patient user, prescription, timeslot) with select_related, and
+    the headline counts are taken from the already-loaded lists or the
+    profile's workload counters instead of running extra COUNT(*) queries.
+    The specialty queue and the answered history grow without bound, so
+    they are cursor-paginated, each on an indexed HelpRequest column.
+    """
+    panels = _doctor_panels(doctor_profile, now, answered_cursor, pending_cursor)
+    results = await concurrency.gather(*panels.values())
+    return _doctor_context(doctor_profile, now, dict(zip(panels, results)))
+
+
+def _patient_panels(patient_profile, now, requests_cursor, history_cursor):
+    upcoming_appointments = (
+        Appointment.objects.filter(
+            patient=patient_profile,
+            timeslot__start_time__gte=_start_of_day(now),
+            status='Booked'
+        ).select_related('timeslot__doctor__user').order_by('timeslot__start_time')
+    )
+    requests = HelpRequest.objects.filter(patient=patient_profile)
+    return {
+        'upcoming_appointments': lambda: list(upcoming_appointments),
+        'past_requests': lambda: paginate(
+            requests.select_related('prescription', 'doctor__user'), REQUESTS_ORDERING, requests_cursor
+        ),
+        'medical_history': lambda: paginate(
+            PatientMedicalHistory.objects.filter(patient=patient_profile), HISTORY_ORDERING, history_cursor
+        ),
+    }
+
+
+def _patient_context(patient_profile, now, panels):
+    return {
+        **panels,
+        'pending_count': patient_profile.pending_request_count,
+        'answered_count': patient_profile.answered_request_count,
+        'now': now,
+    }
+
+
+async def aload_patient_dashboard(patient_profile, now, requests_cursor=None, history_cursor=None):
+    """
+    Builds every panel of the patient dashboard in a fixed number of queries,
+    run through concurrency.gather. The request and medical histories are
+    cursor-paginated; the pending/answered counts are the profile's workload
+    counters.
+    """
+    panels = _patient_panels(patient_profile, now, requests_cursor, history_cursor)
+    results = await concurrency.gather(*panels.values())
+    return _patient_context(patient_profile, now, dict(zip(panels, results)))
+
+
+async def aload_admin_dashboard(start_date, end_date):
+    """
+    The admin dashboard's user counts, all-time request totals and the
+    per-day request counts for the chart, queried concurrently.
+    """
+    patient_count, doctor_count, totals, per_day = await concurrency.gather(
+        User.objects.filter(role='patient').count,
+        User.objects.filter(role='doctor').count,
+        stats.status_totals,
+        lambda: stats.requests_per_day(start_date, end_date),
+    )
+    return {'patient_count': patient_count, 'doctor_count': doctor_count, 'totals': totals, 'per_day': per_day}
@@ -1,7 +1,11 @@
 # In healthcare_app/decorators.py
 
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
 from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
 from django.shortcuts import redirect
+from . import fragments
 
 def role_required(allowed_roles=[]):
     """
@@ -9,5 +13,42 @@ def role_required(allowed_roles=[]):
     """
     def check_role(user):
         return user.is_authenticated and user.role in allowed_roles
-    
-    return user_passes_test(check_role, login_url='login')
\ No newline at end of file
+
+    async def acheck_role(user):
+        # The user is already loaded; reading its role needs no sync hop
+        return check_role(user)
+
+    def decorator(view_func):
+        test = acheck_role if iscoroutinefunction(view_func) else check_role
+        return user_passes_test(test, login_url='login')(view_func)
+    return decorator
+
+
+def cache_anonymous_page(name, *scopes):
+    """
+    Per-view counterpart of {% cachefragment %}: caches the whole response
+    to an anonymous GET, keyed on `name`, the URL and the current versions
+    of `scopes`, so bumping a scope invalidates it like a fragment. Pages
+    for logged-in users carry their own navbar, notifications and CSRF
+    tokens, so those keep to fragment caching. Responses that set a cookie,
+    used a CSRF token or showed flash messages are never stored.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+            key = fragments.fragment_key(f'page:{name}', scopes, [request.get_full_path()])
+            response = cache.get(key)
+            fragments.hit_stats.record(f'page:{name}', response is not None)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.streaming and not response.cookies
+                    and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+                    and not getattr(getattr(request, '_messages', None), 'used', False)):
+                cache.set(key, response, fragments.FRAGMENT_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
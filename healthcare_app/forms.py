@@ -3,7 +3,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.forms import AuthenticationForm
-from .models import User, PatientProfile, DoctorProfile,HelpRequest,Prescription,TimeSlot,Appointment,PatientMedicalHistory
+from .models import User, PatientProfile, DoctorProfile,HelpRequest,Prescription,TimeSlot,Appointment,PatientMedicalHistory,WeeklyScheduleRule, MIN_SLOT_MINUTES
 from datetime import datetime
 
 class SignUpForm(UserCreationForm):
@@ -169,6 +169,38 @@ class ScheduleGenerationForm(forms.Form):
                 raise forms.ValidationError("End time must be after start time.")
         return cleaned_data
 
+class WeeklyScheduleRuleForm(forms.ModelForm):
+    class Meta:
+        model = WeeklyScheduleRule
+        fields = ['weekday', 'start_time', 'end_time', 'slot_minutes', 'break_minutes']
+        widgets = {
+            'weekday': forms.Select(attrs={'class': 'form-select'}),
+            'start_time': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
+            'end_time': forms.TimeInput(attrs={'type': 'time', 'class': 'form-control'}),
+            'slot_minutes': forms.NumberInput(attrs={'class': 'form-control', 'min': MIN_SLOT_MINUTES}),
+            'break_minutes': forms.NumberInput(attrs={'class': 'form-control', 'min': 0}),
+        }
+        labels = {
+            'slot_minutes': 'Slot Length (minutes)',
+            'break_minutes': 'Break After Each Slot (minutes)',
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_time = cleaned_data.get("start_time")
+        end_time = cleaned_data.get("end_time")
+        slot_minutes = cleaned_data.get("slot_minutes")
+
+        if start_time and end_time and end_time <= start_time:
+            raise forms.ValidationError("End time must be after start time.")
+        if slot_minutes is not None and slot_minutes < MIN_SLOT_MINUTES:
+            raise forms.ValidationError(f"Slots must be at least {MIN_SLOT_MINUTES} minutes long.")
+        return cleaned_data
+
+class RecurringScheduleGenerationForm(forms.Form):
+    start_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    weeks = forms.IntegerField(min_value=1, max_value=26, initial=4, widget=forms.NumberInput(attrs={'class': 'form-control'}))
+
 class AppointmentBookingForm(forms.ModelForm):
     class Meta:
         model = Appointment
@@ -0,0 +1,78 @@
+# In healthcare_app/fragments.py
+
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from django.core.cache import cache
+
+# How long a rendered fragment is kept. Fragments are never served stale
+# (a version bump changes their key), so this only bounds memory.
+FRAGMENT_TIMEOUT = 60 * 60
+
+
+def _version_key(scope):
+    return f'fragments:version:{scope}'
+
+
+def versions(scopes):
+    """
+    Current version token of each scope ('doctors', 'patient:12', ...), in
+    one cache read. A scope seen for the first time gets a fresh token.
+    """
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, uuid.uuid4().hex, None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def bump(*scopes):
+    """
+    Gives each scope a new version, so every fragment that depends on it is
+    re-rendered on its next use (in every worker, as the cache is shared).
+    """
+    cache.set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+
+
+def fragment_key(name, scopes, extra=()):
+    """
+    Cache key of a rendered fragment: its name plus the current version of
+    every scope it was rendered from.
+    """
+    parts = [str(part) for part in (*scopes, *versions(scopes), *extra)]
+    digest = hashlib.md5(':'.join(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'fragments:{name}:{digest}'
+
+
+class HitStats:
+    """
+    Fragment cache hits and misses per fragment name, counted in process
+    memory (like the request profiler) and shown on the profiling page.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+
+    def record(self, name, hit):
+        with self.lock:
+            self.counts[name, hit] += 1
+
+    def clear(self):
+        with self.lock:
+            self.counts.clear()
+
+    def rows(self):
+        with self.lock:
+            counts = dict(self.counts)
+        names = sorted({name for name, _ in counts})
+        rows = []
+        for name in names:
+            hits, misses = counts.get((name, True), 0), counts.get((name, False), 0)
+            rows.append({'name': name, 'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)})
+        return rows
+
+
+hit_stats = HitStats()
@@ -0,0 +1,175 @@
+# In healthcare_app/images.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from PIL import Image, ImageOps, UnidentifiedImageError
+from . import auth_cache
+from . import fragments
+
+# Longest edge, in pixels, of each variant. Every size is also written as WebP
+# under '<name>_webp'.
+VARIANT_SIZES = {'thumb': 256, 'medium': 1024}
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+# model label -> (image field, JSON field the variant paths are stored in)
+IMAGE_FIELDS = {
+    'healthcare_app.PatientProfile': ('profile_picture', 'picture_variants'),
+    'healthcare_app.DoctorProfile': ('profile_picture', 'picture_variants'),
+    'healthcare_app.HelpRequest': ('attachment', 'attachment_variants'),
+}
+# model label -> fragment scope (see fragments.py) to bump when its variants change
+FRAGMENT_SCOPES = {
+    'healthcare_app.PatientProfile': 'patient:{pk}',
+    'healthcare_app.DoctorProfile': 'doctors',
+    'healthcare_app.HelpRequest': 'request:{pk}',
+}
+
+
+def worker_count():
+    return getattr(settings, 'IMAGE_WORKERS', 2)
+
+
+def variant_urls(field_file, variants):
+    """
+    Maps every variant name to its URL, falling back to the original upload
+    for variants that haven't been generated (yet). Returns {} if there is
+    no file at all.
+    """
+    if not field_file:
+        return {}
+    original = field_file.url
+    names = list(VARIANT_SIZES) + [f'{name}_webp' for name in VARIANT_SIZES]
+    return {
+        name: default_storage.url(variants[name]) if variants.get(name) else original
+        for name in names
+    }
+
+
+def needs_processing(instance, image_field, variants_field):
+    """
+    True if the upload in `image_field` has no variants yet. The field's
+    default (the stock avatar) is served as-is.
+    """
+    field_file = getattr(instance, image_field)
+    default = instance._meta.get_field(image_field).default
+    return bool(field_file) and field_file.name != default and \
+        getattr(instance, variants_field).get('source') != field_file.name
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == 'WEBP':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    elif fmt == 'PNG':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        image.convert('RGB').save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render_variants(source_name):
+    """
+    Reads an upload and writes its size-capped variants next to it, in the
+    original's format family (PNG if it has transparency, JPEG otherwise)
+    and as WebP. Orientation is baked in from EXIF and then all metadata is
+    dropped, since the pixels are re-encoded from scratch. Returns
+    {variant name: storage path}.
+    """
+    with default_storage.open(source_name, 'rb') as f:
+        image = Image.open(f)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    # '<dir>/variants/<upload file name>/<variant>.<ext>', so a variant path
+    # leads back to its upload (see media.source_name)
+    directory, filename = os.path.split(source_name)
+    fallback = ('PNG', 'png') if has_alpha else ('JPEG', 'jpg')
+
+    paths = {}
+    for name, size in VARIANT_SIZES.items():
+        variant = image.copy()
+        variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for key, (fmt, ext) in ((name, fallback), (f'{name}_webp', ('WEBP', 'webp'))):
+            path = os.path.join(directory, 'variants', filename, f'{name}.{ext}')
+            paths[key] = default_storage.save(path, ContentFile(_encode(variant, fmt)))
+    return paths
+
+
+def process_image(model_label, pk, source_name):
+    """
+    Generates the variants of one upload and records them on its row. The
+    UPDATE only applies if the row still points at the same upload, so a
+    newer upload that raced this job isn't overwritten with stale paths.
+    """
+    image_field, variants_field = IMAGE_FIELDS[model_label]
+    model = apps.get_model(model_label)
+    try:
+        variants = render_variants(source_name)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        # Unreadable or hostile image: keep serving the original
+        variants = {}
+    variants['source'] = source_name
+
+    row = model.objects.filter(pk=pk, **{image_field: source_name})
+    previous = row.values_list(variants_field, flat=True).first()
+    if previous is not None and row.update(**{variants_field: variants}):
+        if previous.get('source') != source_name:
+            delete_variants(previous)
+        # update() skips post_save; cached fragments showing the image
+        # should pick up the new variant URLs
+        fragments.bump(FRAGMENT_SCOPES[model_label].format(pk=pk))
+        if model_label != 'healthcare_app.HelpRequest':
+            # the sidebar avatar comes from the cached user's profile
+            auth_cache.forget(pk)
+    else:
+        delete_variants(variants)
+    return variants
+
+
+def delete_variants(variants):
+    for name, path in variants.items():
+        if name != 'source' and path:
+            default_storage.delete(path)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _run_in_worker(model_label, pk, source_name):
+    try:
+        process_image(model_label, pk, source_name)
+    finally:
+        # Worker threads get their own connection; don't leak it
+        connection.close()
+
+
+def enqueue(instance):
+    """
+    Schedules variant generation for `instance`'s upload on the worker pool,
+    off the request path. With IMAGE_WORKERS = 0 the work runs inline
+    instead (used by tests and management commands).
+    """
+    model_label = instance._meta.label
+    image_field, _ = IMAGE_FIELDS[model_label]
+    source_name = getattr(instance, image_field).name
+
+    workers = worker_count()
+    if not workers:
+        return process_image(model_label, instance.pk, source_name)
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='images')
+    _executor.submit(_run_in_worker, model_label, instance.pk, source_name)
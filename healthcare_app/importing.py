@@ -0,0 +1,180 @@
+# In healthcare_app/importing.py
+
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from .models import User, DoctorProfile, PatientProfile
+from . import auth_cache, fragments
+
+BATCH_SIZE = 1000
+USER_FIELDS = ('email', 'first_name', 'last_name')
+READ_SIZE = 64 * 1024
+
+
+def iter_json_array(f):
+    """
+    Yields the objects of a top-level JSON array one at a time, reading the
+    file in chunks, so a 50k-row export never has to fit in memory at once.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+    while True:
+        stripped = buffer.lstrip(' \t\r\n,')
+        if not started and stripped.startswith('['):
+            stripped = stripped[1:].lstrip(' \t\r\n,')
+            started = True
+        if started and stripped.startswith(']'):
+            return
+        if started and stripped:
+            try:
+                obj, end = decoder.raw_decode(stripped)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                buffer = stripped[end:]
+                yield obj
+                continue
+        if eof:
+            if stripped:
+                raise ValueError('Expected a JSON array of objects.')
+            return
+        chunk = f.read(READ_SIZE)
+        eof = not chunk
+        buffer = stripped + chunk
+
+
+def read_rows(path, fmt=None):
+    """
+    Streams rows (dicts) from a JSON array, JSON Lines or CSV file. The
+    format is taken from the extension unless given.
+    """
+    fmt = fmt or path.rsplit('.', 1)[-1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        elif fmt in ('jsonl', 'ndjson'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif fmt == 'json':
+            yield from iter_json_array(f)
+        else:
+            raise ValueError(f"Unsupported format '{fmt}'. Use json, jsonl or csv.")
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class UserImporter:
+    """
+    Upserts users of one role, and their profiles, a batch at a time: one
+    SELECT to find which usernames already exist, then bulk INSERTs (and,
+    with update=True, bulk UPDATEs) for the rest. Every row without its own
+    'password' gets the same hash of `default_password`, computed once; rows
+    with their own password are hashed in a process pool when `workers` > 1.
+    """
+    def __init__(self, role, default_password, update=False, workers=1):
+        if role not in ('doctor', 'patient'):
+            raise ValueError("role must be 'doctor' or 'patient'")
+        self.role = role
+        self.profile_model = DoctorProfile if role == 'doctor' else PatientProfile
+        self.default_hash = make_password(default_password)
+        self.update = update
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup) if workers > 1 else None
+        self.created = self.updated = self.skipped = 0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def _hash_passwords(self, passwords):
+        if self.pool is None:
+            return [make_password(p) for p in passwords]
+        return list(self.pool.map(make_password, passwords, chunksize=64))
+
+    def _clean(self, batch):
+        """
+        Drops rows without a username and duplicate usernames within the
+        batch (the last one wins).
+        """
+        rows = {}
+        for row in batch:
+            username = (row.get('username') or '').strip()
+            if not username:
+                self.skipped += 1
+                continue
+            if username in rows:
+                self.skipped += 1
+            rows[username] = row
+        return rows
+
+    def import_batch(self, batch):
+        rows = self._clean(batch)
+        existing = {u.username: u for u in User.objects.filter(username__in=rows)}
+
+        new_rows = [(username, row) for username, row in rows.items() if username not in existing]
+        own_passwords = [row['password'] for _, row in new_rows if row.get('password')]
+        hashes = iter(self._hash_passwords(own_passwords))
+
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(
+                    username=username,
+                    role=self.role,
+                    password=next(hashes) if row.get('password') else self.default_hash,
+                    **{field: (row.get(field) or '').strip() for field in USER_FIELDS},
+                )
+                for username, row in new_rows
+            ])
+            self.created += len(new_rows)
+
+            # Other roles are never converted by an import
+            matching = {name: user for name, user in existing.items() if user.role == self.role}
+            self.skipped += len(existing) - len(matching)
+            if self.update and matching:
+                for username, user in matching.items():
+                    for field in USER_FIELDS:
+                        if rows[username].get(field):
+                            setattr(user, field, rows[username][field].strip())
+                User.objects.bulk_update(matching.values(), USER_FIELDS)
+                self.updated += len(matching)
+            elif not self.update:
+                self.skipped += len(matching)
+
+            # Profiles for the new users, and for existing users missing one
+            ids = User.objects.filter(username__in=[u for u, _ in new_rows] + list(matching)).values_list('username', 'id')
+            profiles = {username: self._profile(user_id, rows[username]) for username, user_id in ids}
+            self.profile_model.objects.bulk_create(profiles.values(), ignore_conflicts=True)
+            if self.update and self.role == 'doctor':
+                changed = [profiles[u] for u in matching if (rows[u].get('specialty') or '').strip()]
+                DoctorProfile.objects.bulk_update(changed, ['specialty'])
+            # Existing users may have been updated or given a missing
+            # profile; drop their cached copies once the batch commits
+            auth_cache.forget(*(user.pk for user in matching.values()))
+
+            # Bulk writes skip the post_save receivers that invalidate the
+            # cached panels, so invalidate them here
+            if profiles:
+                scopes = self._fragment_scopes(profile.user_id for profile in profiles.values())
+                transaction.on_commit(lambda: fragments.bump(*scopes))
+
+    def _fragment_scopes(self, user_ids):
+        if self.role == 'doctor':
+            return ['doctors']
+        return [f'patient:{user_id}' for user_id in user_ids]
+
+    def _profile(self, user_id, row):
+        if self.role == 'doctor':
+            specialty = (row.get('specialty') or '').strip() or DoctorProfile._meta.get_field('specialty').default
+            return DoctorProfile(user_id=user_id, specialty=specialty)
+        return PatientProfile(user_id=user_id)
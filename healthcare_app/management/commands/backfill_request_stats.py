@@ -0,0 +1,34 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from healthcare_app.models import HelpRequest
+from healthcare_app import stats
+
+class Command(BaseCommand):
+    help = 'Rebuilds the HelpRequestDailyStat table from existing help requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to rebuild (YYYY-MM-DD). Defaults to the oldest request.')
+        parser.add_argument('--end', help='Last day to rebuild (YYYY-MM-DD). Defaults to today.')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else timezone.localdate()
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+
+        if start is None:
+            oldest = HelpRequest.objects.aggregate(oldest=Min('requested_at'))['oldest']
+            if oldest is None:
+                self.stdout.write(self.style.WARNING('No help requests found. Nothing to backfill.'))
+                return
+            start = timezone.localdate(oldest)
+
+        if start > end:
+            raise CommandError('--start must not be after --end.')
+
+        self.stdout.write(f'Rebuilding request stats from {start} to {end}...')
+        written = stats.rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} daily stat rows.'))
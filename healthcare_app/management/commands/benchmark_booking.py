@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from healthcare_app.models import User, DoctorProfile, PatientProfile, TimeSlot, Appointment
+from healthcare_app.booking import book_slot
+
+BENCH_PREFIX = 'bench_booking_'
+
+class Command(BaseCommand):
+    help = ('Races many patients for the same time slot and reports double-bookings and booking throughput. '
+            'Creates its own throwaway doctor, patients and slots, and deletes them afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=20, help='Concurrent patients racing for each slot (default: 20).')
+        parser.add_argument('--slots', type=int, default=50, help='Number of contested slots, one race per slot (default: 50).')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated data instead of deleting it.')
+
+    def handle(self, *args, **options):
+        contenders = options['patients']
+        rounds = options['slots']
+        if contenders < 2 or rounds < 1:
+            raise CommandError('Need at least 2 patients and 1 slot.')
+
+        self.cleanup()
+        doctor, patients, slots = self.create_data(contenders, rounds)
+        self.stdout.write(f'Racing {contenders} patients for each of {rounds} slots...')
+
+        wins = Counter()
+        errors = Counter()
+        attempts = 0
+        started = time.perf_counter()
+        try:
+            for slot in slots:
+                attempts += self.race(slot, patients, wins, errors)
+        finally:
+            elapsed = time.perf_counter() - started
+
+        double_booked = sum(1 for slot in slots if wins[slot.id] > 1)
+        stored = Counter(Appointment.objects.filter(timeslot__in=slots).values_list('timeslot_id', flat=True))
+        double_stored = sum(1 for count in stored.values() if count > 1)
+        unbooked = rounds - len(stored)
+
+        self.stdout.write(f'Booking attempts:     {attempts}')
+        self.stdout.write(f'Successful bookings:  {sum(wins.values())}')
+        self.stdout.write(f'Database errors:      {sum(errors.values())} {dict(errors) if errors else ""}')
+        self.stdout.write(f'Slots left unbooked:  {unbooked}')
+        self.stdout.write(f'Elapsed:              {elapsed:.3f}s')
+        self.stdout.write(f'Throughput:           {attempts / elapsed:.1f} attempts/s, {len(stored) / elapsed:.1f} bookings/s')
+
+        if double_booked or double_stored:
+            self.stdout.write(self.style.ERROR(f'DOUBLE BOOKINGS: {double_booked} slot(s) claimed twice, {double_stored} stored twice.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Zero double-bookings.'))
+
+        if not options['keep']:
+            self.cleanup()
+
+    def race(self, slot, patients, wins, errors):
+        """
+        Starts one thread per patient and releases them together so they all
+        try to book `slot` at the same moment. Returns the number of attempts.
+        """
+        barrier = threading.Barrier(len(patients))
+        lock = threading.Lock()
+
+        def attempt(patient):
+            try:
+                barrier.wait()
+                appointment = book_slot(slot.id, patient, Appointment(reason='Benchmark booking'))
+                if appointment is not None:
+                    with lock:
+                        wins[slot.id] += 1
+            except DatabaseError as e:
+                # e.g. "database is locked" on SQLite; counted, not fatal
+                with lock:
+                    errors[type(e).__name__] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt, args=(patient,)) for patient in patients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(threads)
+
+    def create_data(self, contenders, rounds):
+        doctor_user = User.objects.create(username=f'{BENCH_PREFIX}doctor', role='doctor')
+        doctor = DoctorProfile.objects.create(user=doctor_user)
+
+        users = User.objects.bulk_create([
+            User(username=f'{BENCH_PREFIX}patient{i}', role='patient') for i in range(contenders)
+        ])
+        users = list(User.objects.filter(username__in=[u.username for u in users]))
+        patients = PatientProfile.objects.bulk_create([PatientProfile(user=user) for user in users])
+
+        start = timezone.now() + timedelta(days=365)
+        slots = TimeSlot.objects.bulk_create([
+            TimeSlot(doctor=doctor, start_time=start + timedelta(minutes=30 * i), end_time=start + timedelta(minutes=30 * (i + 1)))
+            for i in range(rounds)
+        ])
+        slots = list(TimeSlot.objects.filter(doctor=doctor).order_by('start_time'))
+        return doctor, patients, slots
+
+    def cleanup(self):
+        # Deleting the users cascades to profiles, slots, appointments and notifications
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
@@ -0,0 +1,75 @@
+import json
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from healthcare_app.benchmarks import compare, load_report, run_suite
+from healthcare_app.models import User
+from healthcare_app.seeding import SCALE_PREFIX, ScaleSeeder, delete_scale_data
+
+class Command(BaseCommand):
+    help = ('Measures latency percentiles, SQL query counts and SQL time for every URL and the chat socket, '
+            'using the test client against the configured database. Writes the results as JSON and can '
+            'compare them with a saved baseline.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, help='Seed this many synthetic patients first (see seed_activity --scale), unless scale data already exists.')
+        parser.add_argument('--reset', action='store_true', help='With --scale, replace existing scale data instead of reusing it.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for --scale (default: 42).')
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per scenario (default: 20).')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per scenario first (default: 2).')
+        parser.add_argument('--only', nargs='+', metavar='NAME', help='Run only these scenarios (URL names, or ws:chat_connect / ws:chat_message).')
+        parser.add_argument('--output', default='benchmark.json', help='Where to write the JSON results (default: benchmark.json).')
+        parser.add_argument('--baseline', help='A previous results file to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 slowdown against the baseline, as a fraction (default: 0.2).')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error if the baseline comparison finds regressions.')
+        parser.add_argument('--in-memory-channels', action='store_true', help='Run the chat scenarios on an in-memory channel layer instead of the configured one.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations must be positive and --warmup not negative.')
+        baseline = load_report(options['baseline']) if options['baseline'] else None
+
+        if options['scale']:
+            self.seed(options['scale'], options['seed'], options['reset'])
+
+        overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+        if options['in_memory_channels']:
+            overrides['CHANNEL_LAYERS'] = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+        self.stdout.write(f"Running {options['iterations']} iterations per scenario...")
+        with override_settings(**overrides):
+            try:
+                report = run_suite(options['iterations'], options['warmup'], options['only'], log=self.stdout.write)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.stdout.write(f"\n{'scenario':<32}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'sql ms':>9}")
+        for name, result in report['results'].items():
+            self.stdout.write(f"{name:<32}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                              f"{result['queries']:>9g}{result['sql_ms']:>9.1f}")
+        if report['meta']['not_covered']:
+            self.stdout.write(self.style.WARNING(f"Not covered: {', '.join(report['meta']['not_covered'])}"))
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+        if baseline is not None:
+            regressions = compare(report, baseline, options['tolerance'])
+            for line in regressions:
+                self.stdout.write(self.style.ERROR(f'REGRESSION {line}'))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}."))
+            elif options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["baseline"]}.')
+
+    def seed(self, scale, seed, reset):
+        existing = User.objects.filter(username__startswith=SCALE_PREFIX)
+        if existing.exists() and not reset:
+            self.stdout.write('Reusing existing scale data (pass --reset to regenerate).')
+            return
+        delete_scale_data()
+        started = time.perf_counter()
+        ScaleSeeder(scale, max(6, scale // 100), seed=seed, log=self.stdout.write).run()
+        self.stdout.write(f'Seeded {scale} patients in {time.perf_counter() - started:.1f}s.')
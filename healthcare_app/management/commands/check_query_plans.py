@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from healthcare_app import query_plans
+
+class Command(BaseCommand):
+    help = ('Runs EXPLAIN on the queries every view issues (one request per URL, as in benchmark_views) and '
+            'flags sequential scans of large tables. Run it against a realistically sized database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-rows', type=int, default=query_plans.MIN_ROWS,
+                            help=f'Only flag scans of tables with at least this many rows (default: {query_plans.MIN_ROWS}).')
+        parser.add_argument('--only', nargs='+', metavar='NAME', help='Check only these URL names.')
+        parser.add_argument('--show-plans', action='store_true', help='Print every plan, not just the flagged ones.')
+        parser.add_argument('--fail', action='store_true', help='Exit with an error if any scan is flagged.')
+
+    def handle(self, *args, **options):
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            try:
+                plans, sizes = query_plans.check(options['min_rows'], options['only'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        flagged = [plan for plan in plans if plan.seq_scans]
+        for plan in plans:
+            if not plan.seq_scans and not options['show_plans']:
+                continue
+            if plan.seq_scans:
+                tables = ', '.join(f'{table} (~{sizes[table]:,} rows)' for table in plan.seq_scans)
+                self.stdout.write(self.style.WARNING(f'[{plan.scenario}] sequential scan of {tables}'))
+            else:
+                self.stdout.write(f'[{plan.scenario}]')
+            self.stdout.write(f'  {plan.sql}')
+            for line in plan.plan.splitlines():
+                self.stdout.write(f'    {line}')
+
+        scenarios = len({plan.scenario for plan in plans})
+        summary = f'Checked {len(plans)} queries from {scenarios} views; {len(flagged)} scan large tables sequentially.'
+        if flagged:
+            self.stdout.write(self.style.WARNING(summary))
+            if options['fail']:
+                raise CommandError(f'{len(flagged)} query plan(s) scan large tables.')
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
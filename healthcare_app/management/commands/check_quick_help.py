@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from healthcare_app.quick_help import compile_tree
+
+class Command(BaseCommand):
+    help = 'Compiles the Quick Help decision tree and reports cycles, dangling options and a missing root'
+
+    def handle(self, *args, **kwargs):
+        tree = compile_tree()
+        self.stdout.write(f'Compiled {len(tree.questions)} questions and {len(tree.options)} options.')
+
+        if tree.problems:
+            for problem in tree.problems:
+                self.stdout.write(self.style.ERROR(f'  - {problem}'))
+            raise CommandError(f'{len(tree.problems)} problem(s) found in the Quick Help tree.')
+
+        self.stdout.write(self.style.SUCCESS('The Quick Help tree is valid.'))
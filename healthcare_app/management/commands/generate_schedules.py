@@ -0,0 +1,35 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from healthcare_app.models import WeeklyScheduleRule
+from healthcare_app.scheduling import slots_from_rules, save_slots
+
+class Command(BaseCommand):
+    help = "Generates time slots for every doctor's weekly availability rules in one transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day to generate (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--weeks', type=int, default=13, help='Number of weeks to generate (default: 13, one quarter).')
+        parser.add_argument('--doctor', action='append', help='Only generate for this doctor username (repeatable).')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else timezone.localdate()
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        if options['weeks'] < 1:
+            raise CommandError('--weeks must be at least 1.')
+
+        rules = WeeklyScheduleRule.objects.all()
+        if options['doctor']:
+            rules = rules.filter(doctor__user__username__in=options['doctor'])
+        rules = list(rules)
+
+        if not rules:
+            self.stdout.write(self.style.WARNING('No weekly schedule rules found. Nothing to generate.'))
+            return
+
+        doctor_count = len({rule.doctor_id for rule in rules})
+        self.stdout.write(f"Generating {options['weeks']} week(s) of slots from {start} for {doctor_count} doctor(s)...")
+        created, skipped = save_slots(slots_from_rules(rules, start, options['weeks']))
+        self.stdout.write(self.style.SUCCESS(f'Created {created} time slots ({skipped} skipped due to conflicts).'))
@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from healthcare_app.importing import BATCH_SIZE, UserImporter, batched, read_rows
+
+class Command(BaseCommand):
+    help = ('Bulk-imports doctors or patients from a JSON array, JSON Lines or CSV file. Columns: username, email, '
+            'first_name, last_name, optional password and (for doctors) specialty. Existing usernames are skipped '
+            'unless --update is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument('--role', choices=['doctor', 'patient'], required=True)
+        parser.add_argument('--format', choices=['json', 'jsonl', 'csv'], help='File format. Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f'Rows per transaction (default: {BATCH_SIZE}).')
+        parser.add_argument('--password', default='password123', help='Password for rows without a password column.')
+        parser.add_argument('--update', action='store_true', help='Update name, email and specialty of existing users.')
+        parser.add_argument('--workers', type=int, default=1, help='Processes used to hash per-row passwords (default: 1).')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        self.stdout.write(f"Importing {options['role']}s from {options['path']}...")
+        importer = UserImporter(options['role'], options['password'], update=options['update'], workers=options['workers'])
+        started = time.perf_counter()
+        processed = 0
+        try:
+            for batch in batched(read_rows(options['path'], options['format']), options['batch_size']):
+                importer.import_batch(batch)
+                processed += len(batch)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'  {processed} rows ({processed / elapsed:.0f} rows/s)')
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Import stopped after {processed} rows: {e}')
+        finally:
+            importer.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.perf_counter() - started:.2f}s: {importer.created} created, '
+            f'{importer.updated} updated, {importer.skipped} skipped.'
+        ))
@@ -0,0 +1,25 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from healthcare_app.images import IMAGE_FIELDS, process_image
+
+class Command(BaseCommand):
+    help = 'Generates the resized/WebP variants of profile pictures and attachments uploaded before the image pipeline existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate variants even for uploads that already have them.')
+
+    def handle(self, *args, **options):
+        for model_label, (image_field, variants_field) in IMAGE_FIELDS.items():
+            model = apps.get_model(model_label)
+            default = model._meta.get_field(image_field).default
+            rows = model.objects.exclude(**{image_field: ''}).exclude(**{f'{image_field}__isnull': True})
+            done = 0
+            for pk, name, variants in rows.values_list('pk', image_field, variants_field).iterator():
+                if name == default:
+                    continue
+                if options['all'] or variants.get('source') != name:
+                    process_image(model_label, pk, name)
+                    done += 1
+            self.stdout.write(f'{model._meta.verbose_name_plural}: processed {done} image(s).')
+
+        self.stdout.write(self.style.SUCCESS('Image variants are up to date.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from healthcare_app.importing import batched
+from healthcare_app.models import HelpRequest
+from healthcare_app.search import index_help_requests, uses_postgres_search
+
+class Command(BaseCommand):
+    help = 'Rebuilds the case search index for every help request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Requests indexed per batch (default: 1000).')
+
+    def handle(self, *args, **options):
+        backend = 'PostgreSQL search vectors' if uses_postgres_search() else 'the SearchTerm table'
+        self.stdout.write(f'Rebuilding case search index in {backend}...')
+
+        count = 0
+        ids = HelpRequest.objects.order_by('pk').values_list('pk', flat=True).iterator()
+        for batch in batched(ids, options['batch_size']):
+            index_help_requests(batch)
+            count += len(batch)
+            self.stdout.write(f'  {count} requests indexed...')
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} help requests.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from healthcare_app import counters
+
+class Command(BaseCommand):
+    help = ('Recomputes the workload counters on doctor and patient profiles (requests by status, booked '
+            'appointments) from the help request and appointment tables, fixing any that have drifted.')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Checking profile workload counters...')
+        fixed = counters.repair()
+        if fixed:
+            self.stdout.write(self.style.WARNING(f'Corrected the counters of {fixed} profile(s).'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All counters were already correct.'))
@@ -1,16 +1,54 @@
 import random
+import time
 from datetime import timedelta
 from django.utils import timezone
 from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
 from healthcare_app.models import (
     User, DoctorProfile, PatientProfile, TimeSlot, Appointment,
     HelpRequest, Prescription
 )
+from healthcare_app.seeding import SCALE_PASSWORD, SCALE_PREFIX, ScaleSeeder, delete_scale_data
 
 class Command(BaseCommand):
-    help = 'Seeds the database with a large, high-profile, and realistic dataset.'
+    help = ('Seeds the database with a large, high-profile, and realistic dataset. With --scale N, generates a '
+            'synthetic clinic of N patients for benchmarking instead (existing data is left alone).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, help='Generate this many patients, with their requests, appointments, chats and notifications.')
+        parser.add_argument('--doctors', type=int, help='Doctors to generate in scale mode (default: one per 100 patients).')
+        parser.add_argument('--days', type=int, default=365, help='Days of history to generate in scale mode (default: 365).')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed; the same seed gives the same data set (default: 42).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert (default: 5000).')
+        parser.add_argument('--reset', action='store_true', help=f'Delete previously generated scale data (users named {SCALE_PREFIX}*) first.')
 
     def handle(self, *args, **kwargs):
+        if kwargs.get('scale') is not None:
+            return self.seed_scale(**kwargs)
+        return self.seed_scenarios()
+
+    def seed_scale(self, scale, doctors, days, seed, batch_size, reset, **kwargs):
+        doctors = doctors or max(6, scale // 100)
+        if scale < 1 or doctors < 6 or days < 1 or batch_size < 1:
+            raise CommandError('--scale, --days and --batch-size must be positive and --doctors at least 6 (one per specialty).')
+
+        if reset:
+            self.stdout.write('Deleting previous scale data...')
+            delete_scale_data()
+        elif User.objects.filter(username__startswith=SCALE_PREFIX).exists():
+            raise CommandError('Scale data already exists. Re-run with --reset to replace it.')
+
+        started = time.perf_counter()
+        seeder = ScaleSeeder(scale, doctors, days=days, seed=seed, batch_size=batch_size, log=self.stdout.write)
+        counts = seeder.run()
+        for model, count in counts.items():
+            self.stdout.write(f'  {model:<24}{count:>12,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {sum(counts.values()):,} rows in {time.perf_counter() - started:.1f}s. '
+            f'All generated users have the password "{SCALE_PASSWORD}".'
+        ))
+
+    def seed_scenarios(self):
         self.stdout.write(self.style.SUCCESS('--- Starting High-Profile Database Seeding ---'))
 
         # 1. Cleanup Old Activity Data for a clean slate
@@ -0,0 +1,206 @@
+# In healthcare_app/media.py
+
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+from .models import HelpRequest, DoctorProfile, PatientProfile
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def clean_path(path):
+    """
+    Normalizes a requested media path, or returns None if it tries to
+    climb out of MEDIA_ROOT.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    if path in ('', '.') or path == '..' or path.startswith('../'):
+        return None
+    return path
+
+
+def source_name(path):
+    """
+    Maps a variant path ('attachments/variants/scan.jpg/thumb.webp') back to
+    the upload it was made from; other paths are returned unchanged.
+    """
+    parts = path.split('/')
+    if len(parts) >= 4 and parts[-3] == 'variants':
+        return '/'.join(parts[:-3] + [parts[-2]])
+    return path
+
+
+def is_admin(user):
+    return user.is_staff or user.role == 'admin'
+
+
+def can_access(user, path):
+    """
+    Whether `user` may download the media file at `path`:
+      - attachments: the patient, the assigned doctor, doctors of the
+        specialty while the request is still pending, and admins
+      - doctor pictures and the stock avatar: any signed-in user
+      - patient pictures: the patient, doctors and admins
+    Files no row points at are never served.
+    """
+    source = source_name(path)
+    if source == DoctorProfile._meta.get_field('profile_picture').default:
+        return True
+
+    if source.startswith('attachments/'):
+        help_request = HelpRequest.objects.filter(attachment=source).first()
+        if help_request is None:
+            return False
+        if is_admin(user):
+            return True
+        if user.role == 'patient':
+            return help_request.patient_id == user.id
+        if user.role == 'doctor':
+            return help_request.doctor_id == user.id or (
+                help_request.status == 'Pending' and
+                DoctorProfile.objects.filter(user_id=user.id, specialty=help_request.specialty).exists()
+            )
+        return False
+
+    if DoctorProfile.objects.filter(profile_picture=source).exists():
+        return True
+    owner_id = PatientProfile.objects.filter(profile_picture=source).values_list('user_id', flat=True).first()
+    if owner_id is None:
+        return False
+    return owner_id == user.id or user.role == 'doctor' or is_admin(user)
+
+
+def parse_range(header, size):
+    """
+    Parses a single-range `Range: bytes=...` header. Returns (start, end)
+    inclusive, None to serve the whole file (no header, or a form we don't
+    support such as multiple ranges), or False if the range can't be
+    satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _stream(name, start, length):
+    """
+    Yields `length` bytes of the stored file from `start`, CHUNK_SIZE at a
+    time, so memory use doesn't depend on the file size.
+    """
+    with default_storage.open(name, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def _astream(name, start, length):
+    """
+    _stream for ASGI servers. Django buffers a sync iterator whole before
+    sending it over ASGI, so each chunk is read in a worker thread instead.
+    """
+    f = await sync_to_async(default_storage.open)(name, 'rb')
+    try:
+        await sync_to_async(f.seek)(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await sync_to_async(f.read)(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await sync_to_async(f.close)()
+
+
+def _not_modified(request, etag, modified):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+    since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return since is not None and int(modified) <= since
+
+
+def serve(request, path):
+    """
+    Builds the response for an already-authorized, cleaned media path. With
+    MEDIA_ACCEL_REDIRECT set, the body is left to the front-end server
+    (nginx X-Accel-Redirect); otherwise the file is streamed with
+    ETag/Last-Modified validation and single-range support.
+    """
+    if not default_storage.exists(path):
+        raise Http404('No such file.')
+
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', '')
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        # nginx decodes the URI, so names with spaces, '?' or '%' must be quoted
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + quote(path)
+        response['Cache-Control'] = 'private'
+        return response
+
+    size = default_storage.size(path)
+    modified = default_storage.get_modified_time(path).timestamp()
+    etag = f'"{int(modified):x}-{size:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(modified),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, max-age=3600',
+    }
+
+    if _not_modified(request, etag, modified):
+        response = HttpResponseNotModified()
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range not in (etag, headers['Last-Modified']):
+        # The client's partial copy is stale: send the whole new file
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    stream = _astream if isinstance(request, ASGIRequest) else _stream
+    response = StreamingHttpResponse(stream(path, start, length), content_type=content_type)
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(length)
+    for key, value in headers.items():
+        response[key] = value
+    return response
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0012_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HelpRequestDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('specialty', models.CharField(choices=[('General Medicine', 'General Medicine'), ('Dermatology', 'Dermatology'), ('Orthopedics', 'Orthopedics'), ('Cardiology', 'Cardiology'), ('Neurology', 'Neurology')], max_length=50)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('In Progress', 'In Progress'), ('Answered', 'Answered'), ('Closed', 'Closed')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'specialty', 'status'), name='unique_helprequest_daily_stat')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0014_weeklyschedulerule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='timeslot',
+            name='held_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='held_timeslots', to='healthcare_app.patientprofile'),
+        ),
+        migrations.AddField(
+            model_name='timeslot',
+            name='held_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='timeslot',
+            constraint=models.CheckConstraint(condition=models.Q(('is_booked', False), ('held_by__isnull', True), _connector='OR'), name='timeslot_booked_not_held'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0015_timeslot_held_by_timeslot_held_until_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(condition=models.Q(('is_booked', False)), fields=['start_time', 'id'], name='timeslot_open_start_idx'),
+        ),
+    ]
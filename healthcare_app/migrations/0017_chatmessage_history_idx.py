@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0016_timeslot_open_start_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['appointment', 'timestamp', 'id'], name='chatmessage_history_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:25
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_search_gin_index(apps, schema_editor):
+    # GIN indexes only exist on PostgreSQL; other databases use SearchTerm.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX helprequest_search_gin ON healthcare_app_helprequest USING GIN (search_vector)'
+        )
+
+
+def drop_search_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS helprequest_search_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0017_chatmessage_history_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='helprequest',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=50)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('help_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='healthcare_app.helprequest')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'help_request'], name='searchterm_term_idx')],
+                'constraints': [models.UniqueConstraint(fields=('help_request', 'term'), name='unique_searchterm_per_request')],
+            },
+        ),
+        migrations.RunPython(create_search_gin_index, drop_search_gin_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('healthcare_app', '0018_case_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['patient', 'requested_at', 'id'], name='helprequest_patient_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patientmedicalhistory',
+            index=models.Index(fields=['patient', 'recorded_at', 'id'], name='medhistory_patient_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'date_joined', 'id'], name='user_role_joined_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:53
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, outer_field):
+    counted = queryset.filter(**{outer_field: OuterRef('pk')}).order_by().values(outer_field).annotate(n=Count('*')).values('n')
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    # A frozen copy of the recount in healthcare_app.counters, so later
+    # changes to the app code can't break this migration
+    HelpRequest = apps.get_model('healthcare_app', 'HelpRequest')
+    Appointment = apps.get_model('healthcare_app', 'Appointment')
+    booked = Appointment.objects.filter(status='Booked')
+    apps.get_model('healthcare_app', 'PatientProfile').objects.update(
+        pending_request_count=count(HelpRequest.objects.filter(status='Pending'), 'patient'),
+        active_request_count=count(HelpRequest.objects.filter(status='In Progress'), 'patient'),
+        answered_request_count=count(HelpRequest.objects.filter(status='Answered'), 'patient'),
+        booked_appointment_count=count(booked, 'patient'),
+    )
+    apps.get_model('healthcare_app', 'DoctorProfile').objects.update(
+        active_request_count=count(HelpRequest.objects.filter(status='In Progress'), 'doctor'),
+        answered_request_count=count(HelpRequest.objects.filter(status='Answered'), 'doctor'),
+        booked_appointment_count=count(booked, 'timeslot__doctor'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0020_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doctorprofile',
+            name='active_request_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='doctorprofile',
+            name='answered_request_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='doctorprofile',
+            name='booked_appointment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='patientprofile',
+            name='active_request_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='patientprofile',
+            name='answered_request_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='patientprofile',
+            name='booked_appointment_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='patientprofile',
+            name='pending_request_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:56
+
+from django.db import migrations
+from django.db.models import Count, Exists, OuterRef
+
+
+def drop_duplicate_slots(apps, schema_editor):
+    # Before the unique (doctor, start_time) constraint: of each group of
+    # duplicates keep one slot, preferring a booked one (then the oldest),
+    # and delete the unbooked rest. Booked duplicates are left for the
+    # constraint to report, since deleting them would drop appointments.
+    TimeSlot = apps.get_model('healthcare_app', 'TimeSlot')
+    Appointment = apps.get_model('healthcare_app', 'Appointment')
+    groups = (
+        TimeSlot.objects.values('doctor_id', 'start_time')
+        .annotate(n=Count('id')).filter(n__gt=1).order_by()
+    )
+    for group in groups:
+        slots = list(
+            TimeSlot.objects.filter(doctor_id=group['doctor_id'], start_time=group['start_time'])
+            .annotate(has_appointment=Exists(Appointment.objects.filter(timeslot=OuterRef('pk'))))
+            .order_by('-has_appointment', '-is_booked', 'id')
+        )
+        TimeSlot.objects.filter(
+            id__in=[slot.id for slot in slots[1:] if not slot.is_booked and not slot.has_appointment]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+    # Deleting slots cascades to other tables; kept apart from the schema
+    # changes in 0023 so PostgreSQL doesn't refuse the ALTER TABLE with
+    # "pending trigger events".
+
+    dependencies = [
+        ('healthcare_app', '0021_workload_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_slots, migrations.RunPython.noop),
+    ]
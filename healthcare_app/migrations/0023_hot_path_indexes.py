@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0022_drop_duplicate_slots'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['specialty', 'requested_at'], name='helprequest_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['doctor', 'status', 'requested_at'], name='helprequest_doctor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user', '-created_at'], name='notification_unread_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timeslot',
+            constraint=models.UniqueConstraint(fields=('doctor', 'start_time'), name='unique_timeslot_doctor_start'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:23
+
+from django.db import migrations
+
+
+def raise_short_slots(apps, schema_editor):
+    # Rules saved outside the form (e.g. in the admin) could have slots
+    # under 5 minutes, which the constraint added in 0025 rejects
+    WeeklyScheduleRule = apps.get_model('healthcare_app', 'WeeklyScheduleRule')
+    WeeklyScheduleRule.objects.filter(slot_minutes__lt=5).update(slot_minutes=5)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0023_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(raise_short_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:23
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0024_raise_short_rule_slots'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='weeklyschedulerule',
+            name='slot_minutes',
+            field=models.PositiveIntegerField(default=30, validators=[django.core.validators.MinValueValidator(5)]),
+        ),
+        migrations.AddConstraint(
+            model_name='weeklyschedulerule',
+            constraint=models.CheckConstraint(condition=models.Q(('slot_minutes__gte', 5)), name='schedulerule_min_slot_minutes'),
+        ),
+    ]
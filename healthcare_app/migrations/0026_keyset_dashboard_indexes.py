@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare_app', '0025_weeklyschedulerule_min_slot_minutes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='helprequest',
+            name='helprequest_pending_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='helprequest',
+            name='helprequest_doctor_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(condition=models.Q(('status', 'Pending')), fields=['specialty', 'requested_at', 'id'], name='helprequest_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helprequest',
+            index=models.Index(fields=['doctor', 'status', 'requested_at', 'id'], name='helprequest_doctor_status_idx'),
+        ),
+    ]
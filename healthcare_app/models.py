@@ -1,7 +1,10 @@
 # In healthcare_app/models.py
 
+from django.core.validators import MinValueValidator
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
+from .images import variant_urls
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -11,6 +14,13 @@ class User(AbstractUser):
     )
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='patient')
 
+    class Meta(AbstractUser.Meta):
+        swappable = 'AUTH_USER_MODEL'
+        indexes = [
+            # Serves keyset pagination of the admin's user lists
+            models.Index(fields=['role', 'date_joined', 'id'], name='user_role_joined_idx'),
+        ]
+
 class DoctorProfile(models.Model):
 
     SPECIALTY_CHOICES = [
@@ -27,6 +37,18 @@ class DoctorProfile(models.Model):
     years_of_experience = models.PositiveIntegerField(default=0)
 
     profile_picture = models.ImageField(default='images/default_avatar.png', upload_to='profile_pics/')
+    # Resized/WebP copies of profile_picture, written by the image pipeline
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Workload counters, kept in step by the HelpRequest/Appointment signals
+    # (see counters.py); `repair_counters` recomputes them
+    active_request_count = models.IntegerField(default=0, editable=False)
+    answered_request_count = models.IntegerField(default=0, editable=False)
+    booked_appointment_count = models.IntegerField(default=0, editable=False)
+
+    @property
+    def picture_urls(self):
+        return variant_urls(self.profile_picture, self.picture_variants)
 
     def __str__(self):
         return self.user.username
@@ -38,6 +60,19 @@ class PatientProfile(models.Model):
     contact = models.CharField(max_length=15, null=True, blank=True)
 
     profile_picture = models.ImageField(default='images/default_avatar.png', upload_to='profile_pics/')
+    # Resized/WebP copies of profile_picture, written by the image pipeline
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Workload counters, kept in step by the HelpRequest/Appointment signals
+    # (see counters.py); `repair_counters` recomputes them
+    pending_request_count = models.IntegerField(default=0, editable=False)
+    active_request_count = models.IntegerField(default=0, editable=False)
+    answered_request_count = models.IntegerField(default=0, editable=False)
+    booked_appointment_count = models.IntegerField(default=0, editable=False)
+
+    @property
+    def picture_urls(self):
+        return variant_urls(self.profile_picture, self.picture_variants)
 
     def __str__(self):
         return self.user.username
@@ -66,6 +101,25 @@ class HelpRequest(models.Model):
 
     specialty = models.CharField(max_length=50, choices=SPECIALTY_CHOICES, default='General Medicine')
     attachment = models.ImageField(upload_to='attachments/', null=True, blank=True)
+    attachment_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Full-text index of the issue and its prescription (PostgreSQL only,
+    # GIN-indexed in migration 0018). Other databases use SearchTerm.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Serves keyset pagination of a patient's request history
+            models.Index(fields=['patient', 'requested_at', 'id'], name='helprequest_patient_page_idx'),
+            # The shared Pending queue of a specialty, oldest first
+            models.Index(fields=['specialty', 'requested_at', 'id'], condition=models.Q(status='Pending'), name='helprequest_pending_idx'),
+            # A doctor's active and answered cases, and keyset pagination of them
+            models.Index(fields=['doctor', 'status', 'requested_at', 'id'], name='helprequest_doctor_status_idx'),
+        ]
+
+    @property
+    def attachment_urls(self):
+        return variant_urls(self.attachment, self.attachment_variants)
 
     def __str__(self):
         return f"Request from {self.patient.user.username} - Status: {self.status}"
@@ -79,12 +133,38 @@ class Prescription(models.Model):
     def __str__(self):
         return f"Prescription for Request ID: {self.help_request.id}"
 
+class SearchTerm(models.Model):
+    """
+    Portable inverted index for case search on databases without full-text
+    support: one row per distinct word of a help request and its
+    prescription, weighted by where the word appears.
+    """
+    help_request = models.ForeignKey(HelpRequest, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=50)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'help_request'], name='searchterm_term_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['help_request', 'term'], name='unique_searchterm_per_request'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> Request {self.help_request_id}"
+
 class PatientMedicalHistory(models.Model):
     patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE)
     condition_name = models.CharField(max_length=255)
     status = models.CharField(max_length=100)
     recorded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'recorded_at', 'id'], name='medhistory_patient_page_idx'),
+        ]
+
     def __str__(self):
         return f"{self.patient.user.username} - {self.condition_name}"
 
@@ -122,9 +202,61 @@ class TimeSlot(models.Model):
     end_time = models.DateTimeField()
     is_booked = models.BooleanField(default=False)
 
+    # A short-lived claim while a patient fills in the booking form
+    held_by = models.ForeignKey(PatientProfile, on_delete=models.SET_NULL, null=True, blank=True, related_name='held_timeslots')
+    held_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # A booked slot can't still be on hold for someone
+            models.CheckConstraint(condition=models.Q(is_booked=False) | models.Q(held_by__isnull=True), name='timeslot_booked_not_held'),
+            # One slot per doctor per start time; its index also serves a
+            # doctor's schedule for a date range
+            models.UniqueConstraint(fields=['doctor', 'start_time'], name='unique_timeslot_doctor_start'),
+        ]
+        indexes = [
+            # Earliest open slots first, for the first-available search
+            models.Index(fields=['start_time', 'id'], condition=models.Q(is_booked=False), name='timeslot_open_start_idx'),
+        ]
+
     def __str__(self):
         return f"Slot for Dr. {self.doctor.user.username} from {self.start_time.strftime('%Y-%m-%d %H:%M')} to {self.end_time.strftime('%H:%M')}"
 
+MIN_SLOT_MINUTES = 5
+
+class WeeklyScheduleRule(models.Model):
+    """
+    A recurring block of availability, e.g. "Mondays 09:00-13:00 in 20-minute
+    slots with a 5-minute break after each". Several rules on the same day
+    (morning and afternoon) leave room for a lunch break.
+    """
+    WEEKDAY_CHOICES = (
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    )
+
+    doctor = models.ForeignKey(DoctorProfile, on_delete=models.CASCADE, related_name='schedule_rules')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    # Shorter slots aren't bookable, and 0 would never advance the schedule
+    slot_minutes = models.PositiveIntegerField(default=30, validators=[MinValueValidator(MIN_SLOT_MINUTES)])
+    break_minutes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['weekday', 'start_time']
+        constraints = [
+            models.CheckConstraint(condition=models.Q(slot_minutes__gte=MIN_SLOT_MINUTES), name='schedulerule_min_slot_minutes'),
+        ]
+
+    def __str__(self):
+        return f"Dr. {self.doctor.user.username}: {self.get_weekday_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
 class Appointment(models.Model):
 
     STATUS_CHOICES = (
@@ -149,6 +281,12 @@ class ChatMessage(models.Model):
     message = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serves keyset pagination of a consultation's history
+            models.Index(fields=['appointment', 'timestamp', 'id'], name='chatmessage_history_idx'),
+        ]
+
     def __str__(self):
         return f"Message by {self.user.username} in Appointment {self.appointment.id}"
     
@@ -161,6 +299,29 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at'] # Show newest notifications first
+        indexes = [
+            # The unread count and newest-unread dropdown of a user
+            models.Index(fields=['user', '-created_at'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.user.username}: {self.message}"
+
+class HelpRequestDailyStat(models.Model):
+    """
+    Pre-aggregated count of help requests per day, specialty and status.
+    Kept up to date by the HelpRequest signals so the admin dashboard can
+    read a handful of rows instead of scanning the request table.
+    """
+    day = models.DateField()
+    specialty = models.CharField(max_length=50, choices=HelpRequest.SPECIALTY_CHOICES)
+    status = models.CharField(max_length=20, choices=HelpRequest.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'specialty', 'status'], name='unique_helprequest_daily_stat'),
+        ]
 
     def __str__(self):
-        return f"Notification for {self.user.username}: {self.message}"
\ No newline at end of file
+        return f"{self.day} {self.specialty} {self.status}: {self.count}"
@@ -0,0 +1,68 @@
+# In healthcare_app/notifications.py
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from .models import Notification
+
+# How many unread notifications the sidebar dropdown shows
+DROPDOWN_LIMIT = 10
+CACHE_TIMEOUT = 300
+
+
+def _cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_summary(user_id):
+    """
+    Returns (unread_count, newest unread notifications) for a user, served
+    from the cache when possible. Only the newest DROPDOWN_LIMIT rows are
+    loaded, however many unread notifications the user has.
+    """
+    key = _cache_key(user_id)
+    summary = cache.get(key)
+    if summary is None:
+        unread = Notification.objects.filter(user_id=user_id, is_read=False)
+        summary = (unread.count(), list(unread.order_by('-created_at')[:DROPDOWN_LIMIT]))
+        cache.set(key, summary, CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_unread_summary(user_id):
+    cache.delete(_cache_key(user_id))
+
+
+def mark_all_as_read(user_id):
+    """
+    Marks every unread notification of a user as read with a single UPDATE.
+    Returns the number of notifications updated.
+    """
+    updated = Notification.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+    invalidate_unread_summary(user_id)
+    return updated
+
+
+def push_notification(notification):
+    """
+    Sends a new notification to the user's open browser tabs through the
+    NotificationConsumer group. Users with no open socket simply see it from
+    the database on their next page load.
+    """
+    # Imported here to avoid a circular import (consumers -> models -> ...)
+    from .consumers import notification_group_name
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(notification_group_name(notification.user_id), {
+            'type': 'notification_message',
+            'id': notification.id,
+            'message': notification.message,
+            'link': notification.link,
+        })
+    except Exception:
+        # The row is already saved; an unreachable channel layer must not
+        # break the request that created the notification.
+        pass
@@ -0,0 +1,123 @@
+# In healthcare_app/pagination.py
+
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    """
+    Turns the sort-key values of the last row on a page into an opaque,
+    URL-safe string the client sends back to get the next page.
+    """
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Reverses encode_cursor. Returns None for a missing or malformed cursor.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+PAGE_SIZE = 20
+
+
+class CursorPage:
+    """
+    One page of a keyset-paginated list. Iterates like the list it wraps, so
+    templates can keep using `{% if %}`/`{% for %}` on it. `next_cursor` is
+    None on the last page; `next_url`/`first_url` are filled in by `link`.
+    """
+    def __init__(self, object_list, next_cursor, is_first):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+        self.next_url = None
+        self.first_url = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def link(self, request, param):
+        """
+        Builds the "older" and "back to newest" URLs for this list, keeping
+        every other query parameter (e.g. the cursor of a second list on the
+        same page) as it is.
+        """
+        query = request.GET.copy()
+        query.pop(param, None)
+        self.first_url = f'?{query.urlencode()}' if query else request.path
+        if self.next_cursor is not None:
+            query[param] = self.next_cursor
+            self.next_url = f'?{query.urlencode()}'
+        return self
+
+
+def _sort_value(obj, field):
+    value = obj
+    for attr in field.lstrip('-').split('__'):
+        value = getattr(value, attr)
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _after(ordering, values):
+    """
+    Keyset filter for "rows that sort after `values`" under `ordering`:
+    (a > x) OR (a = x AND b > y) OR ..., with < for descending fields.
+    """
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[i]})
+        for previous, value in zip(ordering[:i], values):
+            clause &= Q(**{previous.lstrip('-'): value})
+        condition |= clause
+    return condition
+
+
+def paginate(queryset, ordering, cursor=None, per_page=PAGE_SIZE):
+    """
+    Keyset pagination over `queryset` sorted by `ordering`, whose last field
+    must be unique (normally '-id' or 'id'). Each page is one
+    `WHERE <sort key> past cursor ORDER BY ... LIMIT per_page + 1` query, so
+    page 1000 costs the same as page 1, unlike OFFSET. A missing, malformed
+    or stale cursor yields the first page.
+    """
+    ordering = tuple(ordering)
+    values = decode_cursor(cursor)
+    rows = queryset.order_by(*ordering)
+    if values is not None and len(values) == len(ordering):
+        try:
+            rows = rows.filter(_after(ordering, values))
+        except (ValidationError, ValueError, TypeError):
+            values = None
+    else:
+        values = None
+
+    object_list = list(rows[:per_page + 1])
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        next_cursor = encode_cursor([_sort_value(object_list[-1], f) for f in ordering])
+    return CursorPage(object_list, next_cursor, is_first=values is None)
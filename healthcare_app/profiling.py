@@ -0,0 +1,286 @@
+# In healthcare_app/profiling.py
+
+import contextvars
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, nullcontext
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template import base as template_base
+
+# The profile of the request being handled, if it was sampled
+_current = contextvars.ContextVar('request_profile', default=None)
+_MISSING = object()
+
+
+def sample_rate():
+    return getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+
+
+def window_size():
+    return getattr(settings, 'PROFILING_WINDOW', 500)
+
+
+class RequestProfile:
+    """
+    What one sampled request spent its time on. Times are in seconds.
+    """
+    __slots__ = ('queries', 'sql_time', 'template_time', 'template_depth', 'cache_hits', 'cache_misses',
+                 'async_calls', 'async_time', 'total')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Sync calls made from async views, and the time lost getting to
+        # and back from the threads they ran on (see concurrency.gather)
+        self.async_calls = 0
+        self.async_time = 0.0
+        self.total = 0.0
+
+    def server_timing(self):
+        entries = [
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        if self.async_calls:
+            entries.append(f'async;dur={self.async_time * 1000:.1f};desc="{self.async_calls} sync calls"')
+        entries.append(f'total;dur={self.total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if profile is not None:
+            profile.queries += 1
+            profile.sql_time += time.perf_counter() - started
+
+
+def recording_queries():
+    """
+    Counts the queries run on this thread's connections towards the
+    sampled request, for work an async view hands to other threads.
+    """
+    if _current.get() is None:
+        return nullcontext()
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(_record_query))
+    return stack
+
+
+def record_async_calls(calls, boundary_time):
+    profile = _current.get()
+    if profile is not None:
+        profile.async_calls += calls
+        profile.async_time += boundary_time
+
+
+def _timed_render(render):
+    def wrapper(self, context):
+        profile = _current.get()
+        if profile is None:
+            return render(self, context)
+        # Includes render nested templates; only the outermost one is timed
+        profile.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - started
+    wrapper.profiled = True
+    return wrapper
+
+
+def install_template_timer():
+    if not getattr(template_base.Template.render, 'profiled', False):
+        template_base.Template.render = _timed_render(template_base.Template.render)
+
+
+def _counting_get(cache, profile):
+    get = cache.get
+
+    def wrapper(key, default=None, version=None):
+        value = get(key, _MISSING, version=version)
+        if value is _MISSING:
+            profile.cache_misses += 1
+            return default
+        profile.cache_hits += 1
+        return value
+    return wrapper
+
+
+def _counting_get_many(cache, profile):
+    get_many = cache.get_many
+
+    def wrapper(keys, version=None):
+        keys = list(keys)
+        found = get_many(keys, version=version)
+        profile.cache_hits += len(found)
+        profile.cache_misses += len(keys) - len(found)
+        return found
+    return wrapper
+
+
+def _count_cache_lookups(stack, profile):
+    """
+    Swaps in counting get/get_many on this thread's cache objects (they are
+    per-thread, so other requests aren't affected) until `stack` unwinds.
+    """
+    for alias in settings.CACHES:
+        cache = caches[alias]
+        cache.get = _counting_get(cache, profile)
+        cache.get_many = _counting_get_many(cache, profile)
+        stack.callback(vars(cache).pop, 'get', None)
+        stack.callback(vars(cache).pop, 'get_many', None)
+
+
+class Summary:
+    """
+    A rolling window of the last PROFILING_WINDOW samples per URL name. It
+    lives in process memory, so each worker process keeps its own.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=window_size()))
+
+    def add(self, name, profile):
+        sample = (profile.total, profile.queries, profile.sql_time, profile.template_time,
+                  profile.cache_hits, profile.cache_misses, profile.async_time)
+        with self.lock:
+            self.samples[name].append(sample)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+
+    def rows(self):
+        """
+        Per URL name: request count, total-time percentiles and the mean of
+        every other measurement, slowest p95 first. Times are in ms.
+        """
+        with self.lock:
+            snapshot = {name: list(samples) for name, samples in self.samples.items()}
+
+        rows = []
+        for name, samples in snapshot.items():
+            n = len(samples)
+            totals = sorted(s[0] for s in samples)
+            hits = sum(s[4] for s in samples)
+            lookups = hits + sum(s[5] for s in samples)
+            rows.append({
+                'name': name,
+                'count': n,
+                'p50_ms': totals[(n - 1) // 2] * 1000,
+                'p95_ms': totals[min(n - 1, int(n * 0.95))] * 1000,
+                'max_ms': totals[-1] * 1000,
+                'queries': sum(s[1] for s in samples) / n,
+                'sql_ms': sum(s[2] for s in samples) / n * 1000,
+                'template_ms': sum(s[3] for s in samples) / n * 1000,
+                'cache_hit_rate': hits / lookups if lookups else None,
+                'async_ms': sum(s[6] for s in samples) / n * 1000,
+            })
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+
+summary = Summary()
+
+
+def pool_stats():
+    """
+    One row per database alias that uses a connection pool (the production
+    profile): its size, how many connections it has opened in total and how
+    long requests waited to get one. psycopg counts these per process since
+    the pool opened.
+    """
+    rows = []
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        requests = stats.get('requests_num', 0)
+        rows.append({
+            'alias': alias,
+            'size': stats.get('pool_size', 0),
+            'available': stats.get('pool_available', 0),
+            'connections': stats.get('connections_num', 0),
+            'requests': requests,
+            'queued': stats.get('requests_queued', 0),
+            'mean_wait_ms': stats.get('requests_wait_ms', 0) / requests if requests else 0.0,
+            'errors': stats.get('requests_errors', 0),
+        })
+    return rows
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a PROFILING_SAMPLE_RATE fraction of requests (0 turns it off,
+    1 profiles everything): SQL query count and time, template render time,
+    cache hits and misses, time lost crossing the sync/async boundary, and
+    total time. Sampled responses get a Server-Timing header and are added
+    to the per-URL summary admins see on the profiling page. Unsampled
+    requests only pay for one random() call, and under ASGI they don't
+    leave the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_template_timer()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        return self.profile(request, self.get_response)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        # The wrappers are installed on one thread's connections and caches,
+        # so a sampled request is handled from that thread; the sync calls
+        # its async view makes are run back on it.
+        return await sync_to_async(self.profile)(request, async_to_sync(self.get_response))
+
+    def sampled(self):
+        rate = sample_rate()
+        return rate and random.random() < rate
+
+    def profile(self, request, get_response):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(_record_query))
+                _count_cache_lookups(stack, profile)
+                response = get_response(request)
+        finally:
+            profile.total = time.perf_counter() - started
+            _current.reset(token)
+
+        match = request.resolver_match
+        summary.add(match.view_name if match else '<unresolved>', profile)
+        response['Server-Timing'] = profile.server_timing()
+        return response
@@ -0,0 +1,101 @@
+# In healthcare_app/query_plans.py
+
+import re
+from collections import namedtuple
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from .benchmarks import Fixtures, build_scenarios, requester
+
+# Tables smaller than this are read faster whole than through an index, so
+# a sequential scan over them isn't worth reporting.
+MIN_ROWS = 10000
+
+# A SELECT run by a view and its plan; `seq_scans` lists the large tables
+# it reads in full.
+Plan = namedtuple('Plan', ['scenario', 'sql', 'plan', 'seq_scans'])
+
+PG_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+# Django's subquery and join aliases: `"healthcare_app_user" T3`
+TABLE_ALIAS = re.compile(r'"(\w+)" ([A-Z]\d+)\b')
+
+
+def capture_queries(scenarios, fixtures):
+    """
+    {scenario name: distinct SELECTs} issued by one request of each
+    scenario.
+    """
+    captured = {}
+    for scenario in scenarios:
+        request = requester(scenario, fixtures)
+        with CaptureQueriesContext(connection) as ctx:
+            request()
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].lstrip().upper().startswith('SELECT')]
+        captured[scenario.name] = list(dict.fromkeys(selects))
+    return captured
+
+
+def explain(sql):
+    """
+    The database's plan for `sql`, one node per line.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+def scanned_tables(sql, plan):
+    """
+    Tables `plan` reads sequentially. PostgreSQL names them ("Seq Scan on
+    t"); SQLite prints "SCAN t" (index scans add "USING ..."), with
+    Django's aliases mapped back to their tables.
+    """
+    if connection.vendor == 'postgresql':
+        return set(PG_SEQ_SCAN.findall(plan))
+    aliases = dict((alias, table) for table, alias in TABLE_ALIAS.findall(sql))
+    tables = set()
+    for line in plan.splitlines():
+        match = SQLITE_SCAN.match(line.strip())
+        if match:
+            tables.add(aliases.get(match.group(1), match.group(1)))
+    return tables
+
+
+def table_rows():
+    """
+    {table: row count}. PostgreSQL's planner estimates are used where the
+    table has been analyzed, so big tables aren't counted in full.
+    """
+    rows = {}
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r'")
+            rows = {name: count for name, count in cursor.fetchall() if count >= 0}
+        for table in connection.introspection.table_names(cursor):
+            if table not in rows:
+                cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                rows[table] = cursor.fetchone()[0]
+    return rows
+
+
+def check(min_rows=MIN_ROWS, only=None):
+    """
+    Replays every benchmark scenario once, EXPLAINs the SELECTs its view
+    ran and returns a Plan for each, flagging sequential scans of tables
+    with at least `min_rows` rows. Everything runs in a rolled-back
+    transaction, so the data set is left as it was.
+    """
+    with transaction.atomic():
+        fixtures = Fixtures()
+        scenarios = [s for s in build_scenarios(fixtures) if not only or s.name in only]
+        captured = capture_queries(scenarios, fixtures)
+        sizes = table_rows()
+
+        plans = []
+        for name, queries in captured.items():
+            for sql in queries:
+                plan = explain(sql)
+                large = sorted(t for t in scanned_tables(sql, plan) if sizes.get(t, 0) >= min_rows)
+                plans.append(Plan(name, sql, plan, large))
+        transaction.set_rollback(True)
+    return plans, sizes
@@ -0,0 +1,121 @@
+# In healthcare_app/quick_help.py
+
+import threading
+import uuid
+from collections import namedtuple
+from types import MappingProxyType
+from django.core.cache import cache
+from django.db import transaction
+from .models import Symptom, SymptomOption, Suggestion
+
+ROOT_SYMPTOM = 'main_symptom'
+VERSION_KEY = 'quick_help:version'
+
+# Immutable nodes of the compiled decision tree
+Question = namedtuple('Question', ['id', 'name', 'question_text', 'options'])
+Option = namedtuple('Option', ['id', 'option_text', 'next_symptom_id', 'suggestion'])
+Advice = namedtuple('Advice', ['suggestion_text', 'is_prescription_needed'])
+DecisionTree = namedtuple('DecisionTree', ['root', 'questions', 'options', 'problems', 'version'])
+
+
+def compile_tree(version=None):
+    """
+    Loads the whole Symptom/SymptomOption/Suggestion graph in three queries
+    and freezes it into namedtuples and read-only mappings. Configuration
+    problems (missing root, dangling options, cycles) are collected in
+    `problems` rather than raised, so one bad path doesn't take the whole
+    feature down.
+    """
+    advice = {
+        s.option_id: Advice(s.suggestion_text, s.is_prescription_needed)
+        for s in Suggestion.objects.filter(option__isnull=False)
+    }
+
+    options_by_symptom = {}
+    options = {}
+    for o in SymptomOption.objects.order_by('id'):
+        option = Option(o.id, o.option_text, o.next_symptom_id, advice.get(o.id))
+        options[o.id] = option
+        options_by_symptom.setdefault(o.symptom_id, []).append(option)
+
+    questions = {}
+    root = None
+    for s in Symptom.objects.order_by('id'):
+        questions[s.id] = Question(s.id, s.name, s.question_text, tuple(options_by_symptom.get(s.id, ())))
+        if s.name == ROOT_SYMPTOM:
+            root = questions[s.id]
+
+    problems = []
+    if root is None:
+        problems.append(f"No '{ROOT_SYMPTOM}' symptom is defined.")
+    for option in options.values():
+        if option.next_symptom_id is None and option.suggestion is None:
+            problems.append(f"Option {option.id} ('{option.option_text}') leads nowhere: it has no next symptom and no suggestion.")
+    problems.extend(_find_cycles(questions))
+
+    return DecisionTree(root, MappingProxyType(questions), MappingProxyType(options), tuple(problems), version)
+
+
+def _find_cycles(questions):
+    """
+    Depth-first search over question -> option -> next question edges.
+    Returns one message per cycle found.
+    """
+    WHITE, GREY, BLACK = 0, 1, 2
+    colour = dict.fromkeys(questions, WHITE)
+    problems = []
+
+    for start in questions:
+        if colour[start] != WHITE:
+            continue
+        colour[start] = GREY
+        stack = [(start, iter(questions[start].options))]
+        while stack:
+            question_id, remaining = stack[-1]
+            option = next(remaining, None)
+            if option is None:
+                colour[question_id] = BLACK
+                stack.pop()
+                continue
+            target = option.next_symptom_id
+            if target is None or target not in colour:
+                continue
+            if colour[target] == GREY:
+                path = [q for q, _ in stack]
+                cycle = path[path.index(target):] + [target]
+                problems.append("Cycle in Quick Help: " + " -> ".join(questions[q].name for q in cycle))
+            elif colour[target] == WHITE:
+                colour[target] = GREY
+                stack.append((target, iter(questions[target].options)))
+    return problems
+
+
+_tree = None
+_lock = threading.Lock()
+
+
+def get_tree():
+    """
+    Returns the compiled tree, rebuilding it only when an admin edit has
+    bumped the shared version. Serving a step costs one cache read and no
+    database queries.
+    """
+    global _tree
+    version = cache.get(VERSION_KEY)
+    tree = _tree
+    if tree is not None and tree.version == version:
+        return tree
+    with _lock:
+        if _tree is None or _tree.version != version:
+            _tree = compile_tree(version)
+        return _tree
+
+
+def invalidate_tree():
+    """
+    Stores a new shared version so every worker recompiles on its next
+    request. The version only changes once the edit has committed;
+    otherwise a request compiling in between would read the old rows and
+    keep them under the new version.
+    """
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None))
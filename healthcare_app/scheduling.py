@@ -0,0 +1,186 @@
+# In healthcare_app/scheduling.py
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import TimeSlot
+from .booking import not_held_by_others
+
+
+def slots_for_day(doctor_id, day, start_time, end_time, slot_minutes=30, break_minutes=0):
+    """
+    Returns unsaved TimeSlots covering start_time-end_time on `day`. A slot
+    that would run past end_time is dropped.
+    """
+    if slot_minutes <= 0:
+        raise ValueError(f'slot_minutes must be positive, got {slot_minutes}.')
+    current = timezone.make_aware(datetime.combine(day, start_time))
+    final = timezone.make_aware(datetime.combine(day, end_time))
+    length = timedelta(minutes=slot_minutes)
+    gap = timedelta(minutes=break_minutes)
+
+    slots = []
+    while current + length <= final:
+        slots.append(TimeSlot(doctor_id=doctor_id, start_time=current, end_time=current + length))
+        current += length + gap
+    return slots
+
+
+def slots_from_rules(rules, start_date, weeks):
+    """
+    Expands WeeklyScheduleRules into unsaved TimeSlots for `weeks` weeks
+    starting on `start_date`.
+    """
+    rules_by_weekday = defaultdict(list)
+    for rule in rules:
+        rules_by_weekday[rule.weekday].append(rule)
+
+    slots = []
+    for offset in range(weeks * 7):
+        day = start_date + timedelta(days=offset)
+        for rule in rules_by_weekday[day.weekday()]:
+            slots.extend(slots_for_day(
+                rule.doctor_id, day, rule.start_time, rule.end_time,
+                rule.slot_minutes, rule.break_minutes,
+            ))
+    return slots
+
+
+class _Timeline:
+    """
+    Non-overlapping busy intervals for one doctor, kept sorted so a new
+    slot can be checked with a binary search.
+    """
+    def __init__(self, intervals):
+        self.starts, self.ends = [], []
+        for start, end in sorted(intervals):
+            if self.ends and start < self.ends[-1]:
+                # Existing rows may overlap each other; merge them.
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def overlaps(self, start, end):
+        i = bisect_right(self.starts, start) - 1
+        if i >= 0 and self.ends[i] > start:
+            return True
+        return i + 1 < len(self.starts) and self.starts[i + 1] < end
+
+    def add(self, start, end):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+
+def save_slots(slots, batch_size=1000):
+    """
+    Saves candidate slots in one transaction, skipping any that overlap an
+    existing slot of the same doctor (or an earlier candidate). Existing
+    slots are read with a single range query over the whole window.
+    Returns (created, skipped).
+    """
+    if not slots:
+        return 0, 0
+
+    doctor_ids = {slot.doctor_id for slot in slots}
+    window_start = min(slot.start_time for slot in slots)
+    window_end = max(slot.end_time for slot in slots)
+
+    with transaction.atomic():
+        busy = defaultdict(list)
+        existing = TimeSlot.objects.filter(
+            doctor_id__in=doctor_ids,
+            start_time__lt=window_end,
+            end_time__gt=window_start,
+        ).values_list('doctor_id', 'start_time', 'end_time')
+        for doctor_id, start, end in existing:
+            busy[doctor_id].append((start, end))
+        timelines = {doctor_id: _Timeline(busy[doctor_id]) for doctor_id in doctor_ids}
+
+        to_create = []
+        for slot in sorted(slots, key=lambda s: (s.doctor_id, s.start_time)):
+            timeline = timelines[slot.doctor_id]
+            if timeline.overlaps(slot.start_time, slot.end_time):
+                continue
+            timeline.add(slot.start_time, slot.end_time)
+            to_create.append(slot)
+
+        created = _insert_slots(to_create, batch_size)
+
+    return created, len(slots) - created
+
+
+def _insert_slots(slots, batch_size):
+    """
+    Inserts the slots and returns how many were created. The overlap check
+    above reads without locking, so a generation running at the same time
+    may have taken some start times first; those slots are then skipped
+    (the unique doctor/start constraint catches them) instead of failing
+    the whole batch.
+    """
+    try:
+        with transaction.atomic():
+            TimeSlot.objects.bulk_create(slots, batch_size=batch_size)
+        return len(slots)
+    except IntegrityError:
+        created = 0
+        for slot in slots:
+            slot.pk = None
+            try:
+                with transaction.atomic():
+                    slot.save(force_insert=True)
+                created += 1
+            except IntegrityError:
+                pass
+        return created
+
+
+def _daily_ranges(window_start, window_end, time_from, time_to):
+    """
+    start_time between time_from and time_to (local time, either may be
+    None) on each day of the window, as OR-ed plain ranges.
+    """
+    ranges = Q(pk__in=[])
+    day = timezone.localdate(window_start)
+    while day <= timezone.localdate(window_end):
+        start = timezone.make_aware(datetime.combine(day, time_from or time.min))
+        if time_to is not None:
+            end = timezone.make_aware(datetime.combine(day, time_to))
+        else:
+            end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+        if start < end:
+            ranges |= Q(start_time__gte=start, start_time__lt=end)
+        day += timedelta(days=1)
+    return ranges
+
+
+def search_open_slots(specialty, window_start, window_end, time_from=None, time_to=None, after=None, limit=20, exclude_held_for=None):
+    """
+    Returns the earliest `limit` open slots across every doctor of a
+    specialty between two datetimes, optionally only those starting within
+    a time-of-day range. `after` is the (start_time, id) of the last slot on
+    the previous page; paging continues from there (keyset pagination), so
+    deep pages cost the same as the first one. Ordering by (start_time, id)
+    matches the partial timeslot_open_start_idx index. A time-of-day range
+    becomes one start_time range per day, so it is an index range too
+    rather than a function of the column.
+    """
+    slots = TimeSlot.objects.filter(
+        is_booked=False,
+        doctor__specialty=specialty,
+        start_time__gte=window_start,
+        start_time__lt=window_end,
+    )
+    if time_from is not None or time_to is not None:
+        slots = slots.filter(_daily_ranges(window_start, window_end, time_from, time_to))
+    if exclude_held_for is not None:
+        slots = slots.filter(not_held_by_others(exclude_held_for, timezone.now()))
+    if after is not None:
+        after_start, after_id = after
+        slots = slots.filter(Q(start_time__gt=after_start) | Q(start_time=after_start, id__gt=after_id))
+
+    return list(slots.select_related('doctor__user').order_by('start_time', 'id')[:limit])
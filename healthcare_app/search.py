@@ -0,0 +1,133 @@
+# In healthcare_app/search.py
+
+import re
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from .models import HelpRequest, Prescription, SearchTerm
+
+SEARCH_CONFIG = 'english'
+RESULTS_PER_PAGE = 20
+
+# Field weights: a diagnosis match ranks above the issue text, which ranks
+# above the prescription text. Letters for PostgreSQL, numbers for SearchTerm.
+WEIGHTS = {'A': 4, 'B': 2, 'C': 1}
+
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from had has have i in is it its my of on or so '
+    'than that the this to was were with'.split()
+)
+
+
+def uses_postgres_search():
+    return connection.vendor == 'postgresql'
+
+
+def tokenize(text):
+    """
+    Lower-cased words of at least two characters, minus common stop words.
+    """
+    return [w[:50] for w in re.findall(r'[a-z0-9]+', (text or '').lower()) if len(w) > 1 and w not in STOP_WORDS]
+
+
+def _weighted_fields(help_request):
+    prescription = getattr(help_request, 'prescription', None)
+    return [
+        (help_request.issue_description, 'B'),
+        (prescription.diagnosis if prescription else '', 'A'),
+        (prescription.prescription_text if prescription else '', 'C'),
+    ]
+
+
+def _search_vector():
+    """
+    The weighted tsvector of a help request, computed in the database from
+    its own text and its prescription's.
+    """
+    prescription = Prescription.objects.filter(help_request=OuterRef('pk'))
+    parts = [
+        (F('issue_description'), 'B'),
+        (Subquery(prescription.values('diagnosis')[:1]), 'A'),
+        (Subquery(prescription.values('prescription_text')[:1]), 'C'),
+    ]
+    vector = None
+    for expression, weight in parts:
+        part = SearchVector(expression, weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def index_help_requests(help_request_ids):
+    """
+    Rebuilds the search index entries of a batch of help requests (issue
+    text plus prescription, if any) with a fixed number of queries.
+    """
+    help_request_ids = list(help_request_ids)
+    if uses_postgres_search():
+        HelpRequest.objects.filter(pk__in=help_request_ids).update(search_vector=_search_vector())
+        return
+
+    terms = []
+    for help_request in HelpRequest.objects.select_related('prescription').filter(pk__in=help_request_ids):
+        scores = {}
+        for text, weight in _weighted_fields(help_request):
+            for term in tokenize(text):
+                scores[term] = scores.get(term, 0) + WEIGHTS[weight]
+        terms.extend(SearchTerm(help_request=help_request, term=term, weight=weight) for term, weight in scores.items())
+    with transaction.atomic():
+        SearchTerm.objects.filter(help_request_id__in=help_request_ids).delete()
+        SearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+
+def index_help_request(help_request_id):
+    index_help_requests([help_request_id])
+
+
+def visible_requests(doctor_profile):
+    """
+    The help requests a doctor may search: their own cases plus the pending
+    queue of their specialty.
+    """
+    return HelpRequest.objects.filter(
+        Q(doctor=doctor_profile) | Q(status='Pending', specialty=doctor_profile.specialty)
+    )
+
+
+def search_cases(doctor_profile, query, page_number=1, per_page=RESULTS_PER_PAGE):
+    """
+    Ranked full-text search over the doctor's visible help requests and their
+    prescriptions. Returns a Paginator page of HelpRequests, each annotated
+    with `rank`.
+    """
+    scope = visible_requests(doctor_profile)
+
+    if uses_postgres_search():
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+        results = (
+            scope.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .select_related('patient__user', 'prescription')
+            .order_by('-rank', '-id')
+        )
+        return Paginator(results, per_page).get_page(page_number)
+
+    # Portable fallback: every query word must match; rank by summed weights
+    terms = set(tokenize(query))
+    scores = (
+        SearchTerm.objects.filter(term__in=terms, help_request__in=scope)
+        .values('help_request_id')
+        .annotate(matched=Count('id'), rank=Sum('weight'))
+        .filter(matched=len(terms))
+        .order_by('-rank', '-help_request_id')
+    )
+    page = Paginator(scores if terms else scores.none(), per_page).get_page(page_number)
+
+    ranks = {row['help_request_id']: row['rank'] for row in page.object_list}
+    requests = HelpRequest.objects.select_related('patient__user', 'prescription').in_bulk(list(ranks))
+    page.object_list = []
+    for help_request_id, rank in ranks.items():
+        help_request = requests[help_request_id]
+        help_request.rank = rank
+        page.object_list.append(help_request)
+    return page
@@ -0,0 +1,393 @@
+# In healthcare_app/seeding.py
+
+import math
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from django.contrib.auth.hashers import make_password
+from django.db import connection, models, transaction
+from django.db.models import Max, Min, Q
+from django.urls import reverse
+from django.utils import timezone
+from .models import (User, DoctorProfile, PatientProfile, HelpRequest, Prescription, PatientMedicalHistory,
+                     SearchTerm, TimeSlot, WeeklyScheduleRule, Appointment, ChatMessage, Notification)
+from . import auth_cache, counters, fragments, search, stats
+from .importing import batched
+
+SCALE_PREFIX = 'scale_'
+SCALE_PASSWORD = 'password123'
+
+# Rough share of demand per specialty (HelpRequest has no Pediatrics queue)
+SPECIALTY_WEIGHTS = {
+    'General Medicine': 40, 'Dermatology': 15, 'Orthopedics': 15,
+    'Cardiology': 15, 'Neurology': 10, 'Pediatrics': 5,
+}
+# Requests arrive mostly during the day, peaking late morning and early evening
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 4, 7, 10, 12, 13, 12, 10, 10, 10, 10, 11, 12, 12, 10, 8, 6, 4, 2]
+REQUESTS_PER_PATIENT = ([0, 1, 2, 3, 4, 6, 10], [10, 25, 22, 16, 12, 10, 5])
+SLOT_HOURS = [9, 10, 11, 13, 14, 15, 16]
+PAST_BOOKING_RATE = 0.7
+FUTURE_BOOKING_RATE = 0.35
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Aarav', 'Priya', 'Wei', 'Mei',
+               'Omar', 'Fatima', 'Carlos', 'Sofia', 'Kwame', 'Amara', 'Yuki', 'Hana', 'Ivan', 'Olga']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+              'Patel', 'Chen', 'Kim', 'Nguyen', 'Khan', 'Singh', 'Okafor', 'Mensah', 'Tanaka', 'Ivanova',
+              'Silva', 'Rossi', 'Muller', 'Dubois', 'Haddad', 'Cohen', 'Larsen', 'Novak', 'Kowalski', 'Murphy']
+
+CASES = {
+    'General Medicine': [
+        ('Dry cough and mild fever for three days, feeling tired.', 'Viral Upper Respiratory Infection', 'Paracetamol 500mg as needed. Rest and fluids.'),
+        ('Recurring tension headaches in the afternoon after screen work.', 'Tension Headache', 'Ibuprofen 400mg as needed. Regular breaks from screens.'),
+        ('Sore throat and trouble swallowing since yesterday.', 'Pharyngitis', 'Warm salt water gargles. Lozenges. Return if fever rises.'),
+        ('Feeling dizzy when standing up quickly.', 'Orthostatic Hypotension', 'Increase fluid and salt intake. Stand up slowly.'),
+    ],
+    'Dermatology': [
+        ('Itchy red rash on my forearm that is not going away.', 'Contact Dermatitis', 'Hydrocortisone cream 1% twice daily for a week.'),
+        ('Painful acne breakouts along the jawline.', 'Acne Vulgaris', 'Benzoyl peroxide 5% gel nightly.'),
+        ('Dry scaly patches on elbows and knees.', 'Plaque Psoriasis', 'Topical corticosteroid and emollients daily.'),
+    ],
+    'Orthopedics': [
+        ('Sharp pain in my left knee after running, minor swelling.', 'Knee Sprain', 'RICE protocol. Naproxen 250mg twice daily for 5 days.'),
+        ('Lower back pain after lifting boxes at work.', 'Lumbar Strain', 'Heat therapy, gentle stretching, ibuprofen as needed.'),
+        ('Wrist pain when typing, tingling in fingers at night.', 'Carpal Tunnel Syndrome', 'Night wrist splint. Ergonomic keyboard setup.'),
+    ],
+    'Cardiology': [
+        ('Occasional heart palpitations after caffeine.', 'Benign Palpitations', 'Reduce caffeine. Holter monitor if symptoms persist.'),
+        ('Chest tightness when climbing stairs.', 'Stable Angina', 'Aspirin 75mg daily. Nitroglycerin as needed. Stress test booked.'),
+        ('Home blood pressure readings consistently high.', 'Hypertension', 'Amlodipine 5mg daily. Low-salt diet. Recheck in 4 weeks.'),
+    ],
+    'Neurology': [
+        ('Tingling sensation in my fingertips for a week.', 'Peripheral Neuropathy', 'Vitamin B12 levels ordered. Follow up with results.'),
+        ('Migraines with flashing lights twice a month.', 'Migraine with Aura', 'Sumatriptan 50mg at onset. Keep a headache diary.'),
+        ('Trouble sleeping and restless legs in the evening.', 'Restless Legs Syndrome', 'Iron studies ordered. Sleep hygiene measures.'),
+    ],
+}
+REQUEST_SPECIALTIES = [s for s, _ in HelpRequest.SPECIALTY_CHOICES]
+
+
+def full_name(index):
+    return FIRST_NAMES[index % len(FIRST_NAMES)], LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+
+
+@contextmanager
+def historical_timestamps():
+    """
+    Lets bulk_create store the generated created-at times instead of "now"
+    by switching auto_now_add off on the affected fields for the duration.
+    """
+    fields = [
+        HelpRequest._meta.get_field('requested_at'),
+        Prescription._meta.get_field('prescribed_at'),
+        PatientMedicalHistory._meta.get_field('recorded_at'),
+        ChatMessage._meta.get_field('timestamp'),
+        Notification._meta.get_field('created_at'),
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def delete_scale_data():
+    """
+    Deletes the generated users (SCALE_PREFIX) and everything that belongs
+    to them with one DELETE per table. An ORM cascade would load every row
+    and run its post_delete receivers (stats, counters, caches) one at a
+    time, millions of queries on a full-size data set; instead the derived
+    data is rebuilt once at the end. Returns the number of users deleted.
+    """
+    users = User.objects.filter(username__startswith=SCALE_PREFIX)
+    ids = users.values('pk')
+    user_ids = list(users.values_list('pk', flat=True))
+    if not user_ids:
+        return 0
+    span = HelpRequest.objects.filter(patient_id__in=ids).aggregate(first=Min('requested_at'), last=Max('requested_at'))
+
+    tables = [
+        ChatMessage.objects.filter(Q(user_id__in=ids) | Q(appointment__patient_id__in=ids) | Q(appointment__timeslot__doctor_id__in=ids)),
+        Notification.objects.filter(user_id__in=ids),
+        Appointment.objects.filter(Q(patient_id__in=ids) | Q(timeslot__doctor_id__in=ids)),
+        TimeSlot.objects.filter(doctor_id__in=ids),
+        WeeklyScheduleRule.objects.filter(doctor_id__in=ids),
+        SearchTerm.objects.filter(help_request__patient_id__in=ids),
+        Prescription.objects.filter(help_request__patient_id__in=ids),
+        HelpRequest.objects.filter(patient_id__in=ids),
+        PatientMedicalHistory.objects.filter(patient_id__in=ids),
+        PatientProfile.objects.filter(pk__in=ids),
+        DoctorProfile.objects.filter(pk__in=ids),
+        User.groups.through.objects.filter(user_id__in=ids),
+        User.user_permissions.through.objects.filter(user_id__in=ids),
+    ]
+    # Anything else pointing at a user (e.g. admin log entries)
+    cleared = {queryset.model for queryset in tables}
+    for relation in User._meta.related_objects:
+        if relation.one_to_many and relation.on_delete is models.CASCADE and relation.related_model not in cleared:
+            tables.append(relation.related_model._base_manager.filter(**{f'{relation.field.attname}__in': ids}))
+
+    with transaction.atomic():
+        # Real users' rows only lose their link to a generated one
+        TimeSlot.objects.filter(held_by_id__in=ids).update(held_by=None, held_until=None)
+        HelpRequest.objects.filter(doctor_id__in=ids).exclude(patient_id__in=ids).update(doctor=None)
+        for queryset in tables:
+            queryset._raw_delete(queryset.db)
+        users._raw_delete(users.db)
+
+        if span['first'] is not None:
+            stats.rebuild(timezone.localdate(span['first']), timezone.localdate(span['last']))
+        counters.repair()
+    for batch in batched(user_ids, 1000):
+        auth_cache.forget(*batch)
+    fragments.bump('doctors')
+    return len(user_ids)
+
+
+class ScaleSeeder:
+    """
+    Generates a synthetic clinic of `patients` patients and `doctors`
+    doctors with `days` days of history: help requests and prescriptions,
+    medical history, a schedule of time slots with appointments and chat
+    transcripts, and the notifications those would have produced. All rows
+    are written with batched bulk_create; the same seed produces the same
+    data set (relative to today's date).
+    """
+    def __init__(self, patients, doctors, days=365, seed=42, batch_size=5000, log=None):
+        self.n_patients = patients
+        self.n_doctors = doctors
+        self.days = days
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        # Generated history ends at midnight this morning, so a given seed
+        # produces the same rows however often it's run on the same day
+        self.now = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.counts = {}
+
+    def run(self):
+        with historical_timestamps():
+            self.create_users()
+            self.create_help_requests()
+            self.create_medical_history()
+            self.create_schedule()
+        self.log('Rebuilding request stats, workload counters and search index...')
+        # moment() goes back as far as days + 1 days before today
+        stats.rebuild(timezone.localdate(self.now - timedelta(days=self.days + 1)), timezone.localdate())
+        counters.repair()
+        for batch in self._chunks(self.request_ids):
+            search.index_help_requests(batch)
+        # The bulk inserts skip the receivers that invalidate the cached
+        # doctor cards. Patient panels need nothing: the patients are new.
+        fragments.bump('doctors')
+        return self.counts
+
+    # -- helpers ------------------------------------------------------------
+
+    def _chunks(self, items):
+        for i in range(0, len(items), self.batch_size):
+            yield items[i:i + self.batch_size]
+
+    def _insert(self, model, objects):
+        """
+        bulk_creates `objects` in batches and makes sure each one has its
+        primary key, re-reading them on backends that can't return ids
+        from a bulk insert.
+        """
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(objects)
+        refetch = objects and objects[0].pk is None and not connection.features.can_return_rows_from_bulk_insert
+        for batch in self._chunks(objects):
+            if refetch:
+                last = model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            model.objects.bulk_create(batch)
+            if refetch:
+                ids = model.objects.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:len(batch)]
+                for obj, pk in zip(batch, ids):
+                    obj.pk = pk
+        return objects
+
+    def moment(self, max_days=None):
+        """
+        A timestamp before today: demand grows over the period (more recent
+        days are likelier), weekends are quieter and most activity is in the
+        daytime.
+        """
+        max_days = max_days or self.days
+        while True:
+            days_ago = int(max_days * (1 - math.sqrt(self.rng.random())))
+            day = self.now - timedelta(days=days_ago + 1)
+            if day.weekday() < 5 or self.rng.random() < 0.4:
+                break
+        hour = self.rng.choices(range(24), HOUR_WEIGHTS)[0]
+        return day + timedelta(hours=hour, minutes=self.rng.randrange(60), seconds=self.rng.randrange(60))
+
+    # -- generators ---------------------------------------------------------
+
+    def create_users(self):
+        self.log(f'Creating {self.n_doctors} doctors and {self.n_patients} patients...')
+        password = make_password(SCALE_PASSWORD)
+        joined_from = self.now - timedelta(days=self.days + 30)
+
+        def user(role, index):
+            first, last = full_name(index)
+            tag = 'dr' if role == 'doctor' else 'pt'
+            return User(username=f'{SCALE_PREFIX}{tag}{index}', email=f'{tag}{index}@scale.example.com',
+                        first_name=first, last_name=last, role=role, password=password,
+                        date_joined=joined_from + timedelta(seconds=self.rng.randrange((self.days + 30) * 86400)))
+
+        doctors = self._insert(User, [user('doctor', i) for i in range(self.n_doctors)])
+        specialties, weights = zip(*SPECIALTY_WEIGHTS.items())
+        doctor_profiles = [
+            DoctorProfile(user_id=u.pk, specialty=self.rng.choices(specialties, weights)[0],
+                          years_of_experience=self.rng.randint(1, 35))
+            for u in doctors
+        ]
+        # Every specialty gets at least one doctor
+        for profile, specialty in zip(doctor_profiles, specialties):
+            profile.specialty = specialty
+        self._insert(DoctorProfile, doctor_profiles)
+        self.doctor_specialty = {p.user_id: p.specialty for p in doctor_profiles}
+        self.doctors_by_specialty = {}
+        for doctor_id, specialty in self.doctor_specialty.items():
+            self.doctors_by_specialty.setdefault(specialty, []).append(doctor_id)
+        self.doctor_names = {u.pk: f'{u.first_name} {u.last_name}' for u in doctors}
+
+        self.patient_ids = []
+        for start in range(0, self.n_patients, self.batch_size):
+            users = self._insert(User, [user('patient', i) for i in range(start, min(start + self.batch_size, self.n_patients))])
+            self._insert(PatientProfile, [
+                PatientProfile(user_id=u.pk, age=self.rng.choices([self.rng.randint(1, 17), self.rng.randint(18, 64), self.rng.randint(65, 95)], [20, 60, 20])[0],
+                               gender=self.rng.choice(['Male', 'Female']))
+                for u in users
+            ])
+            self.patient_ids.extend(u.pk for u in users)
+
+    def create_help_requests(self):
+        self.log('Creating help requests and prescriptions...')
+        counts, weights = REQUESTS_PER_PATIENT
+        request_weights = [SPECIALTY_WEIGHTS[s] for s in REQUEST_SPECIALTIES]
+        self.request_ids = []
+        pending = []
+
+        def flush():
+            requests = self._insert(HelpRequest, [r for r, _ in pending])
+            self.request_ids.extend(r.pk for r in requests)
+            prescriptions = []
+            notifications = []
+            for help_request, case in pending:
+                if help_request.status in ('Answered', 'Closed'):
+                    prescribed_at = min(help_request.requested_at + timedelta(hours=self.rng.uniform(0.5, 48)),
+                                        self.now)
+                    prescriptions.append(Prescription(help_request_id=help_request.pk, diagnosis=case[1],
+                                                      prescription_text=case[2], prescribed_at=prescribed_at))
+                    notifications.append(self.notification(
+                        help_request.patient_id,
+                        f'Dr. {self.doctor_names[help_request.doctor_id]} has answered your help request.',
+                        reverse('patient_dashboard'), prescribed_at,
+                    ))
+            self._insert(Prescription, prescriptions)
+            self._insert(Notification, notifications)
+            pending.clear()
+
+        for patient_id in self.patient_ids:
+            for _ in range(self.rng.choices(counts, weights)[0]):
+                specialty = self.rng.choices(REQUEST_SPECIALTIES, request_weights)[0]
+                case = self.rng.choice(CASES[specialty])
+                requested_at = self.moment()
+                age = (self.now - requested_at).days
+                if age < 2:
+                    status = self.rng.choices(['Pending', 'In Progress', 'Answered'], [50, 30, 20])[0]
+                elif age < 14:
+                    status = self.rng.choices(['Pending', 'In Progress', 'Answered', 'Closed'], [10, 15, 65, 10])[0]
+                else:
+                    status = self.rng.choices(['Pending', 'Answered', 'Closed'], [3, 82, 15])[0]
+                doctor_id = None if status == 'Pending' else self.rng.choice(self.doctors_by_specialty[specialty])
+                pending.append((HelpRequest(patient_id=patient_id, doctor_id=doctor_id, specialty=specialty, status=status,
+                                            issue_description=case[0], requested_at=requested_at), case))
+                if len(pending) >= self.batch_size:
+                    flush()
+        flush()
+
+    def create_medical_history(self):
+        self.log('Creating medical history...')
+        conditions = [case[1] for cases in CASES.values() for case in cases]
+        history = []
+        for patient_id in self.patient_ids:
+            for _ in range(self.rng.choices([0, 1, 2, 3], [50, 30, 15, 5])[0]):
+                history.append(PatientMedicalHistory(
+                    patient_id=patient_id, condition_name=self.rng.choice(conditions),
+                    status=self.rng.choice(['Chronic', 'Resolved', 'Under Treatment']), recorded_at=self.moment(),
+                ))
+            if len(history) >= self.batch_size:
+                self._insert(PatientMedicalHistory, history)
+                history = []
+        self._insert(PatientMedicalHistory, history)
+
+    def create_schedule(self):
+        """
+        Weekday slots for every doctor over the last 60 days and the next
+        30. Most past slots were booked and completed (with a chat
+        transcript); a third of future slots are booked.
+        """
+        self.log('Creating time slots, appointments and chat transcripts...')
+        past_days = min(self.days, 60)
+        first_day = timezone.localdate(self.now) - timedelta(days=past_days)
+        days = [first_day + timedelta(days=i) for i in range(past_days + 30)]
+        days = [d for d in days if d.weekday() < 5]
+
+        doctor_ids = list(self.doctor_specialty)
+        per_group = max(1, self.batch_size // (len(days) * len(SLOT_HOURS) * 2))
+        for start in range(0, len(doctor_ids), per_group):
+            slots = []
+            for doctor_id in doctor_ids[start:start + per_group]:
+                for day in days:
+                    for hour in SLOT_HOURS:
+                        for minute in (0, 30):
+                            slot_start = timezone.make_aware(datetime.combine(day, time(hour, minute)))
+                            rate = PAST_BOOKING_RATE if slot_start < self.now else FUTURE_BOOKING_RATE
+                            slots.append(TimeSlot(doctor_id=doctor_id, start_time=slot_start,
+                                                  end_time=slot_start + timedelta(minutes=30),
+                                                  is_booked=self.rng.random() < rate))
+            self._insert(TimeSlot, slots)
+            self.create_appointments([s for s in slots if s.is_booked])
+
+    def create_appointments(self, slots):
+        appointments = []
+        patients = []
+        for slot in slots:
+            case = self.rng.choice(CASES.get(self.doctor_specialty[slot.doctor_id], CASES['General Medicine']))
+            completed = slot.end_time <= self.now
+            patient_index = self.rng.randrange(len(self.patient_ids))
+            patients.append(patient_index)
+            appointments.append(Appointment(
+                patient_id=self.patient_ids[patient_index], timeslot_id=slot.pk, reason=case[0],
+                status='Completed' if completed else 'Booked',
+                diagnosis=case[1] if completed else '', notes=case[2] if completed else '',
+            ))
+        self._insert(Appointment, appointments)
+
+        messages = []
+        notifications = []
+        for appointment, slot, patient_index in zip(appointments, slots, patients):
+            notifications.append(self.notification(
+                slot.doctor_id, 'Patient {} {} has booked an appointment with you.'.format(*full_name(patient_index)),
+                reverse('doctor_dashboard'), min(slot.start_time - timedelta(days=self.rng.randint(1, 14)), self.now),
+            ))
+            if appointment.status == 'Completed':
+                for i in range(self.rng.randint(2, 12)):
+                    messages.append(ChatMessage(
+                        appointment_id=appointment.pk, user_id=appointment.patient_id if i % 2 == 0 else slot.doctor_id,
+                        message=self.rng.choice(['Hello doctor.', 'How are you feeling today?', 'The pain is a bit better.',
+                                                 'Any side effects from the medication?', 'No, everything is fine.',
+                                                 'Please continue the treatment for another week.', 'Thank you!']),
+                        timestamp=slot.start_time + timedelta(seconds=30 + i * self.rng.randint(20, 120)),
+                    ))
+        self._insert(ChatMessage, messages)
+        self._insert(Notification, notifications)
+
+    def notification(self, user_id, message, link, created_at):
+        recent = (self.now - created_at).days < 14
+        return Notification(user_id=user_id, message=message, link=link, created_at=created_at,
+                            is_read=not recent or self.rng.random() < 0.3)
@@ -1,7 +1,25 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.urls import reverse
-from .models import Prescription, Appointment, Notification
+from .models import (Prescription, Appointment, Notification, HelpRequest, Symptom, SymptomOption, Suggestion,
+                     PatientProfile, DoctorProfile, PatientMedicalHistory, User)
+from . import assignment
+from . import auth_cache
+from . import counters
+from . import fragments
+from . import images
+from . import stats
+from .notifications import invalidate_unread_summary, push_notification
+from .quick_help import invalidate_tree
+from .search import index_help_request
+
+STAT_FIELDS = {'requested_at', 'specialty', 'status'}
+# sender -> (fields the counter key reads, key function, change recorder)
+COUNTED_MODELS = {
+    HelpRequest: ({'patient_id', 'doctor_id', 'status'}, counters.request_key, counters.record_request_change),
+    Appointment: ({'patient_id', 'timeslot_id', 'status'}, counters.appointment_key, counters.record_appointment_change),
+}
 
 @receiver(post_save, sender=Prescription)
 def create_prescription_notification(sender, instance, created, **kwargs):
@@ -31,4 +49,197 @@ def create_appointment_notification(sender, instance, created, **kwargs):
             user=doctor_user,
             message=f"Patient {patient_user.get_full_name()} has booked an appointment with you.",
             link=reverse('doctor_dashboard') 
-        )
\ No newline at end of file
+        )
+
+@receiver(post_init, sender=HelpRequest)
+def remember_request_stat_key(sender, instance, **kwargs):
+    """
+    Remember which daily-stat bucket a loaded request is counted in, so a
+    later save can move it without re-reading the row.
+    """
+    if instance.pk is not None and not (instance.get_deferred_fields() & STAT_FIELDS):
+        instance._stat_key = stats.stat_key(instance)
+
+@receiver(pre_save, sender=HelpRequest)
+def load_request_stat_key(sender, instance, **kwargs):
+    """
+    Instances loaded with deferred fields don't know their bucket yet; read it
+    from the database before the save overwrites it.
+    """
+    if instance.pk is not None and not hasattr(instance, '_stat_key'):
+        stored = HelpRequest.objects.filter(pk=instance.pk).first()
+        instance._stat_key = stats.stat_key(stored) if stored else None
+
+@receiver(post_save, sender=HelpRequest)
+def update_request_stats(sender, instance, created, **kwargs):
+    """
+    Keep HelpRequestDailyStat in step when a request is created or its
+    status (or specialty) changes.
+    """
+    old_key = None if created else getattr(instance, '_stat_key', None)
+    new_key = stats.stat_key(instance)
+    stats.record_change(old_key, new_key)
+    instance._stat_key = new_key
+
+@receiver(post_delete, sender=HelpRequest)
+def remove_request_stats(sender, instance, **kwargs):
+    stats.record_change(getattr(instance, '_stat_key', None) or stats.stat_key(instance), None)
+
+
+@receiver(post_init, sender=HelpRequest)
+@receiver(post_init, sender=Appointment)
+def remember_counter_key(sender, instance, **kwargs):
+    """
+    Remember which profile counters a loaded request or appointment is
+    counted in, so a later save can move it without re-reading the row.
+    """
+    fields, key, _ = COUNTED_MODELS[sender]
+    if instance.pk is not None and not (instance.get_deferred_fields() & fields):
+        instance._counter_key = key(instance)
+
+@receiver(pre_save, sender=HelpRequest)
+@receiver(pre_save, sender=Appointment)
+def load_counter_key(sender, instance, **kwargs):
+    if instance.pk is not None and not hasattr(instance, '_counter_key'):
+        _, key, _ = COUNTED_MODELS[sender]
+        stored = sender.objects.filter(pk=instance.pk).first()
+        instance._counter_key = key(stored) if stored else None
+
+@receiver(post_save, sender=HelpRequest)
+@receiver(post_save, sender=Appointment)
+def update_profile_counters(sender, instance, created, **kwargs):
+    """
+    Keep the profile workload counters in step, in the same transaction as
+    the save, whenever a status or owner changes.
+    """
+    _, key, record = COUNTED_MODELS[sender]
+    new_key = key(instance)
+    record(None if created else getattr(instance, '_counter_key', None), new_key)
+    instance._counter_key = new_key
+
+@receiver(post_delete, sender=HelpRequest)
+@receiver(post_delete, sender=Appointment)
+def remove_from_profile_counters(sender, instance, **kwargs):
+    _, key, record = COUNTED_MODELS[sender]
+    record(getattr(instance, '_counter_key', None) or key(instance), None)
+
+@receiver(post_save, sender=HelpRequest)
+def route_new_request(sender, instance, created, **kwargs):
+    """
+    With AUTO_ASSIGN_REQUESTS on, hand each new request to the least-loaded
+    doctor of its specialty once it is committed, instead of leaving it in
+    the shared Pending queue.
+    """
+    if created and instance.status == 'Pending' and assignment.auto_assign_enabled():
+        request_id = instance.pk
+        transaction.on_commit(lambda: assignment.auto_assign(request_id))
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_notification_cache(sender, instance, **kwargs):
+    """
+    Drop the cached unread count and dropdown whenever a notification changes.
+    """
+    invalidate_unread_summary(instance.user_id)
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    """
+    Push new notifications to connected browsers once the row is committed.
+    """
+    if created:
+        transaction.on_commit(lambda: push_notification(instance))
+
+
+@receiver(post_save, sender=Symptom)
+@receiver(post_delete, sender=Symptom)
+@receiver(post_save, sender=SymptomOption)
+@receiver(post_delete, sender=SymptomOption)
+@receiver(post_save, sender=Suggestion)
+@receiver(post_delete, sender=Suggestion)
+def invalidate_quick_help_tree(sender, **kwargs):
+    """
+    Recompile the in-memory Quick Help tree after any admin edit.
+    """
+    invalidate_tree()
+
+
+@receiver(post_save, sender=HelpRequest)
+def index_request_for_search(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Re-index a request when its text may have changed. Saves that only touch
+    other fields (e.g. status) are skipped.
+    """
+    if created or update_fields is None or 'issue_description' in update_fields:
+        index_help_request(instance.pk)
+
+@receiver(post_save, sender=Prescription)
+def index_prescription_for_search(sender, instance, **kwargs):
+    index_help_request(instance.help_request_id)
+
+
+@receiver(post_save, sender=PatientProfile)
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_save, sender=HelpRequest)
+def queue_image_variants(sender, instance, **kwargs):
+    """
+    Hand a new profile picture or attachment to the image pipeline once the
+    upload is committed.
+    """
+    image_field, variants_field = images.IMAGE_FIELDS[sender._meta.label]
+    if images.needs_processing(instance, image_field, variants_field):
+        transaction.on_commit(lambda: images.enqueue(instance))
+
+
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+def invalidate_doctor_fragments(sender, instance, **kwargs):
+    fragments.bump('doctors')
+
+@receiver(post_save, sender=PatientProfile)
+@receiver(post_delete, sender=PatientProfile)
+@receiver(post_save, sender=PatientMedicalHistory)
+@receiver(post_delete, sender=PatientMedicalHistory)
+def invalidate_patient_fragments(sender, instance, **kwargs):
+    fragments.bump(f"patient:{instance.pk if sender is PatientProfile else instance.patient_id}")
+
+@receiver(post_save, sender=HelpRequest)
+@receiver(post_delete, sender=HelpRequest)
+@receiver(post_save, sender=Prescription)
+@receiver(post_delete, sender=Prescription)
+def invalidate_request_fragments(sender, instance, **kwargs):
+    """
+    A request (or its prescription) shows up on its own detail page and in
+    its patient's history panels.
+    """
+    request_id = instance.help_request_id if sender is Prescription else instance.pk
+    patient_id = instance.patient_id if sender is HelpRequest else \
+        HelpRequest.objects.filter(pk=request_id).values_list('patient_id', flat=True).first()
+    fragments.bump(f'request:{request_id}', *([f'patient:{patient_id}'] if patient_id else []))
+
+@receiver(post_save, sender=User)
+def invalidate_user_fragments(sender, instance, update_fields=None, **kwargs):
+    """
+    Names appear in the cached panels. Logins only touch last_login, which
+    no fragment shows.
+    """
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    if instance.role == 'doctor':
+        fragments.bump('doctors')
+    elif instance.role == 'patient':
+        fragments.bump(f'patient:{instance.pk}')
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=DoctorProfile)
+@receiver(post_delete, sender=DoctorProfile)
+@receiver(post_save, sender=PatientProfile)
+@receiver(post_delete, sender=PatientProfile)
+def forget_cached_user(sender, instance, **kwargs):
+    """
+    A role, password or profile change must reach the next request, not
+    the next expiry of the cached user.
+    """
+    auth_cache.forget(instance.pk)
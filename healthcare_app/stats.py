@@ -0,0 +1,99 @@
+# In healthcare_app/stats.py
+
+from datetime import datetime, time, timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import HelpRequest, HelpRequestDailyStat
+
+
+def stat_key(help_request):
+    """
+    The (day, specialty, status) bucket a help request is counted in.
+    """
+    return (timezone.localdate(help_request.requested_at), help_request.specialty, help_request.status)
+
+
+def bump(day, specialty, status, delta):
+    """
+    Adds `delta` to one bucket, creating the row the first time it is seen.
+    """
+    updated = HelpRequestDailyStat.objects.filter(
+        day=day, specialty=specialty, status=status
+    ).update(count=F('count') + delta)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            HelpRequestDailyStat.objects.create(day=day, specialty=specialty, status=status, count=delta)
+    except IntegrityError:
+        # Another request created the row between our UPDATE and INSERT.
+        HelpRequestDailyStat.objects.filter(
+            day=day, specialty=specialty, status=status
+        ).update(count=F('count') + delta)
+
+
+def record_change(old_key, new_key):
+    """
+    Moves one request from the `old_key` bucket to `new_key`. Either side
+    may be None for a create or a delete.
+    """
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        bump(*old_key, -1)
+    if new_key is not None:
+        bump(*new_key, 1)
+
+
+def rebuild(start, end):
+    """
+    Recomputes every bucket between `start` and `end` (inclusive) from the
+    HelpRequest table. Returns the number of stat rows written.
+    """
+    current_tz = timezone.get_current_timezone()
+    # A plain range on requested_at (not __date) so the column's index applies
+    range_start = timezone.make_aware(datetime.combine(start, time.min), current_tz)
+    range_end = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), current_tz)
+    rows = (
+        HelpRequest.objects.filter(requested_at__gte=range_start, requested_at__lt=range_end)
+        .annotate(day=TruncDate('requested_at', tzinfo=current_tz))
+        .values('day', 'specialty', 'status')
+        .annotate(total=Count('id'))
+    )
+    stats = [
+        HelpRequestDailyStat(day=row['day'], specialty=row['specialty'], status=row['status'], count=row['total'])
+        for row in rows
+    ]
+    with transaction.atomic():
+        HelpRequestDailyStat.objects.filter(day__range=[start, end]).delete()
+        HelpRequestDailyStat.objects.bulk_create(stats)
+    return len(stats)
+
+
+def requests_per_day(start, end):
+    """
+    Returns an ordered {date: count} mapping for every day in the range,
+    with zero for days that had no requests.
+    """
+    per_day = {start + timedelta(days=i): 0 for i in range((end - start).days + 1)}
+    rows = (
+        HelpRequestDailyStat.objects.filter(day__range=[start, end])
+        .values('day')
+        .annotate(total=Sum('count'))
+    )
+    for row in rows:
+        per_day[row['day']] = row['total']
+    return per_day
+
+
+def status_totals(specialty=None):
+    """
+    Returns {status: count} over all time, optionally for one specialty.
+    """
+    rows = HelpRequestDailyStat.objects.all()
+    if specialty is not None:
+        rows = rows.filter(specialty=specialty)
+    rows = rows.values('status').annotate(total=Sum('count'))
+    return {row['status']: row['total'] for row in rows}
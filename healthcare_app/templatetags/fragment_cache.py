@@ -0,0 +1,59 @@
+# In healthcare_app/templatetags/fragment_cache.py
+
+from django import template
+from django.core.cache import cache
+from django.template.base import token_kwargs
+from healthcare_app import fragments
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, scopes, keyed_scopes):
+        self.nodelist = nodelist
+        self.name = name
+        self.scopes = scopes
+        self.keyed_scopes = keyed_scopes
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        scopes = [str(scope.resolve(context)) for scope in self.scopes]
+        scopes += [f'{kind}:{value.resolve(context)}' for kind, value in self.keyed_scopes.items()]
+        key = fragments.fragment_key(name, scopes)
+
+        content = cache.get(key)
+        fragments.hit_stats.record(name, content is not None)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, fragments.FRAGMENT_TIMEOUT)
+        return content
+
+
+@register.tag
+def cachefragment(parser, token):
+    """
+    Caches the enclosed block until one of the scopes it depends on is
+    bumped (see healthcare_app.fragments):
+
+        {% cachefragment "doctor_cards" "doctors" %}...{% endcachefragment %}
+        {% cachefragment "patient_history" patient=appointment.patient_id %}...{% endcachefragment %}
+
+    Positional arguments after the name are scopes; `kind=value` arguments
+    are the scope 'kind:value'. Querysets used only inside the block are
+    never evaluated on a hit.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name and at least one scope.")
+    nodelist = parser.parse(('endcachefragment',))
+    parser.delete_first_token()
+
+    name = parser.compile_filter(bits[1])
+    scopes = []
+    remaining = bits[2:]
+    while remaining and '=' not in remaining[0]:
+        scopes.append(parser.compile_filter(remaining.pop(0)))
+    keyed_scopes = token_kwargs(remaining, parser, support_legacy=False)
+    if remaining:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' got unexpected arguments: {' '.join(remaining)}")
+    return FragmentCacheNode(nodelist, name, scopes, keyed_scopes)
@@ -1,5 +1,6 @@
 # In healthcare_app/urls.py
 
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth.views import LogoutView
 from .views import (
@@ -10,6 +11,8 @@ from .views import (
     doctor_dashboard,
     patient_dashboard,
     request_detail_view,
+    media_view,
+    case_search_view,
     quick_help_view,
     profile_view,
     profile_edit_view,
@@ -18,13 +21,16 @@ from .views import (
     manage_schedule_view,
     doctor_list_view,
     doctor_schedule_view,
+    slot_search_view,
     book_appointment_view,
     appointment_detail_view,
     appointment_history_view,
     consultation_room_view,
     mark_notification_as_read,
+    mark_all_notifications_as_read,
     create_doctor_view,
     manage_users_view,
+    profiling_view,
 )
 from django.contrib.auth import views as auth_views
 
@@ -43,6 +49,7 @@ urlpatterns = [
     # New URL for a single request
     # The <int:request_id> part captures the ID from the URL
     path('request/<int:request_id>/', request_detail_view, name='request_detail'),
+    path('cases/search/', case_search_view, name='case_search'),
     path('quick-help/', quick_help_view, name='quick_help'),
     path('profile/', profile_view, name='profile'),
     path('profile/edit/', profile_edit_view, name='profile_edit'),
@@ -52,14 +59,20 @@ urlpatterns = [
 
     path('doctors/', doctor_list_view, name='doctor_list'),
     path('doctors/<int:doctor_id>/schedule/', doctor_schedule_view, name='doctor_schedule'),
+    path('api/slots/search/', slot_search_view, name='slot_search'),
     path('appointment/book/<int:slot_id>/', book_appointment_view, name='book_appointment'),
     path('appointment/<int:appointment_id>/', appointment_detail_view, name='appointment_detail'),
     path('appointments/history/', appointment_history_view, name='appointment_history'),
 
     path('consultation/<int:appointment_id>/', consultation_room_view, name='consultation_room'),
     path('notifications/read/<int:notification_id>/', mark_notification_as_read, name='mark_notification_as_read'),
+    path('notifications/read-all/', mark_all_notifications_as_read, name='mark_all_notifications_as_read'),
     path('doctors/create/', create_doctor_view, name='create_doctor'),
     path('users/manage/', manage_users_view, name='manage_users'),
+    path('profiling/', profiling_view, name='profiling'),
+
+    # Uploads, served with per-file access checks
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", media_view, name='media'),
 
     #password reset URLs
     path('password/change/',
@@ -5,19 +5,34 @@ from django.shortcuts import render, redirect,get_object_or_404
 from django.contrib import messages
 from .forms import SignUpForm,PrescriptionForm,ProfilePictureUpdateForm
 from django.contrib.auth.decorators import login_required # For basic login check
-from .decorators import role_required # Our custom role checker
+from .decorators import cache_anonymous_page, role_required # Our custom role checker
+from .dashboards import aload_admin_dashboard, aload_doctor_dashboard, aload_patient_dashboard
+from . import concurrency
+from . import stats
+from .notifications import mark_all_as_read
+from .scheduling import slots_for_day, slots_from_rules, save_slots, search_open_slots
+from .pagination import encode_cursor, decode_cursor, paginate
+from .assignment import claim_request
+from .booking import book_slot, hold_slot, hold_seconds, not_held_by_others, release_hold
+from .quick_help import get_tree as get_quick_help_tree
+from .search import search_cases
+from . import media
+from . import profiling
+from . import fragments
 from django.contrib.auth.views import LoginView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.http import Http404, JsonResponse
 from .forms import (SignUpForm, LoginForm,HelpRequestForm,PatientProfileUpdateForm,
                      DoctorProfileUpdateForm,TimeSlotForm,AppointmentNotesForm, MedicalHistoryForm,
-                     ScheduleGenerationForm,AppointmentBookingForm,DoctorCreationForm)
+                     ScheduleGenerationForm,AppointmentBookingForm,DoctorCreationForm,
+                     WeeklyScheduleRuleForm,RecurringScheduleGenerationForm)
 from .models import (User,HelpRequest,Prescription,Symptom, SymptomOption, 
                      Suggestion,PatientMedicalHistory,TimeSlot,DoctorProfile,Appointment,Notification,
-                     PatientProfile)
-from django.db.models import Count
-from django.db.models.functions import TruncDate
-from datetime import date,timedelta,datetime
+                     PatientProfile,WeeklyScheduleRule)
+from datetime import date,timedelta,datetime,time
+from django.db import transaction
 from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
 import json
 
 
@@ -61,56 +76,91 @@ class CustomLoginView(LoginView):
         return reverse_lazy('login')
     
 
+MAX_CHART_DAYS = 366
+
 @login_required
 @role_required(allowed_roles=['admin'])
-def admin_dashboard(request):
-
-    patient_count = User.objects.filter(role='patient').count()
-    doctor_count = User.objects.filter(role='doctor').count()
-    pending_requests_count = HelpRequest.objects.filter(status='Pending').count()
-    completed_requests_count = HelpRequest.objects.filter(status='Answered').count()
-
-    seven_days_ago = timezone.now().date() - timedelta(days=6)
-    requests_per_day_query = (
-        HelpRequest.objects.filter(requested_at__date__gte=seven_days_ago)
-        .annotate(date=TruncDate('requested_at'))
-        .values('date')
-        .annotate(count=Count('id'))
-        .order_by('date')
-    )
-    requests_data = { (seven_days_ago + timedelta(days=i)).strftime('%b %d'): 0 for i in range(7) }
-    for entry in requests_per_day_query:
-        requests_data[entry['date'].strftime('%b %d')] = entry['count']
-    bar_chart_labels = list(requests_data.keys())
+async def admin_dashboard(request):
+    # The chart covers the last 7 days unless a ?start=&end= range is given
+    end_date = timezone.localdate()
+    start_date = end_date - timedelta(days=6)
+    try:
+        if request.GET.get('start'):
+            start_date = date.fromisoformat(request.GET['start'])
+        if request.GET.get('end'):
+            end_date = date.fromisoformat(request.GET['end'])
+    except ValueError:
+        messages.error(request, 'Invalid date range. Showing the last 7 days.')
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=6)
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+    # The chart has one bar per day, so keep the range to about a year
+    if (end_date - start_date).days >= MAX_CHART_DAYS:
+        start_date = end_date - timedelta(days=MAX_CHART_DAYS - 1)
+        messages.warning(request, f'Date range too long. Showing the {MAX_CHART_DAYS} days up to {end_date}.')
+
+    # Request numbers come from the pre-aggregated HelpRequestDailyStat rows
+    data = await aload_admin_dashboard(start_date, end_date)
+    pending_requests_count = data['totals'].get('Pending', 0)
+    completed_requests_count = data['totals'].get('Answered', 0)
+
+    requests_data = data['per_day']
+    bar_chart_labels = [day.strftime('%b %d') for day in requests_data]
     bar_chart_data = list(requests_data.values())
 
     pie_chart_labels = ['Pending', 'Answered']
     pie_chart_data = [pending_requests_count, completed_requests_count]
 
     context = {
-        'patient_count': patient_count,
-        'doctor_count': doctor_count,
+        'patient_count': data['patient_count'],
+        'doctor_count': data['doctor_count'],
         'pending_requests_count': pending_requests_count,
         'completed_requests_count': completed_requests_count,
         'bar_chart_labels': json.dumps(bar_chart_labels),
         'bar_chart_data': json.dumps(bar_chart_data),
         'pie_chart_labels': json.dumps(pie_chart_labels),
         'pie_chart_data': json.dumps(pie_chart_data),
+        'chart_start': start_date,
+        'chart_end': end_date,
     }
-    return render(request, 'admin_dashboard.html', context)
+    return await concurrency.run(lambda: render(request, 'admin_dashboard.html', context))
 
 @login_required
 @role_required(allowed_roles=['admin'])
 def manage_users_view(request):
-    all_patients = User.objects.filter(role='patient').order_by('-date_joined')
-    all_doctors = User.objects.filter(role='doctor').order_by('-date_joined')
-    
+    ordering = ('-date_joined', '-id')
+    all_patients = paginate(
+        User.objects.filter(role='patient'), ordering, request.GET.get('patients')
+    ).link(request, 'patients')
+    all_doctors = paginate(
+        User.objects.filter(role='doctor'), ordering, request.GET.get('doctors')
+    ).link(request, 'doctors')
+
     context = {
         'all_patients': all_patients,
         'all_doctors': all_doctors,
     }
     return render(request, 'manage_users.html', context)
 
+@login_required
+@role_required(allowed_roles=['admin'])
+def profiling_view(request):
+    if request.method == 'POST':
+        profiling.summary.clear()
+        fragments.hit_stats.clear()
+        messages.success(request, 'Profiling samples cleared.')
+        return redirect('profiling')
+
+    context = {
+        'rows': profiling.summary.rows(),
+        'sample_rate': profiling.sample_rate(),
+        'window': profiling.window_size(),
+        'fragment_rows': fragments.hit_stats.rows(),
+        'pool_rows': profiling.pool_stats(),
+    }
+    return render(request, 'profiling.html', context)
+
 @login_required
 @role_required(allowed_roles=['admin'])
 def create_doctor_view(request):
@@ -130,90 +180,74 @@ def create_doctor_view(request):
 
 @login_required
 @role_required(allowed_roles=['doctor'])
-def doctor_dashboard(request):
-    doctor_profile = request.user.doctorprofile
+async def doctor_dashboard(request):
+    user = await request.auser()
+    doctor_profile = await concurrency.run(lambda: user.doctorprofile)
     now = timezone.localtime() # Use localtime for consistency
 
-    # Fetch upcoming appointments
-    upcoming_appointments = Appointment.objects.filter(
-        timeslot__doctor=doctor_profile, 
-        timeslot__start_time__gte=now.replace(hour=0, minute=0, second=0), # Get all from today
-        status='Booked'
-    ).order_by('timeslot__start_time')
-        
-    pending_requests = HelpRequest.objects.filter(status='Pending', specialty=doctor_profile.specialty).order_by('requested_at')
-    active_requests = HelpRequest.objects.filter(doctor=doctor_profile, status='In Progress').order_by('requested_at')
-    answered_requests = HelpRequest.objects.filter(doctor=doctor_profile, status='Answered').order_by('-prescription__prescribed_at')
-
-    context = {
-        'pending_requests': pending_requests,
-        'active_requests': active_requests,
-        'answered_requests': answered_requests,
-        'pending_count': pending_requests.count(),
-        'active_count': active_requests.count(),
-        'answered_by_me_count': answered_requests.count(),
-        'upcoming_appointments': upcoming_appointments,
-        'now': now
-    }
-    return render(request, 'doctor_dashboard.html', context)
+    context = await aload_doctor_dashboard(
+        doctor_profile, now, answered_cursor=request.GET.get('answered'), pending_cursor=request.GET.get('pending'),
+    )
+    context['answered_requests'].link(request, 'answered')
+    context['pending_requests'].link(request, 'pending')
+    return await concurrency.run(lambda: render(request, 'doctor_dashboard.html', context))
 
 @login_required
 @role_required(allowed_roles=['patient'])
-def patient_dashboard(request):
-   
-    if not hasattr(request.user, 'patientprofile'):
+async def patient_dashboard(request):
+    user = await request.auser()
+    patient_profile = await concurrency.run(lambda: getattr(user, 'patientprofile', None))
+    if patient_profile is None:
         # If the user is an admin/staff, send them to the correct dashboard.
-        if request.user.is_staff:
+        if user.is_staff:
             return redirect('admin_dashboard')
         # For any other case, redirect to login to be safe.
         else:
             return redirect('login')
     
-    patient_profile = request.user.patientprofile
     now = timezone.localtime() # Use localtime for consistency
 
-    # Fetch upcoming appointments
-    upcoming_appointments = Appointment.objects.filter(
-        patient=patient_profile,
-        timeslot__start_time__gte=now.replace(hour=0, minute=0, second=0),
-        status='Booked'
-    ).order_by('timeslot__start_time')
-
     if request.method == 'POST':
         form = HelpRequestForm(request.POST, request.FILES)
-        if form.is_valid():
-            new_request = form.save(commit=False); new_request.patient = patient_profile; new_request.save()
+
+        def submit():
+            if not form.is_valid():
+                return False
+            new_request = form.save(commit=False); new_request.patient = patient_profile
+            with transaction.atomic():
+                new_request.save()
+            return True
+
+        if await concurrency.run(submit):
             messages.success(request, 'Your help request has been submitted successfully!')
             return redirect('patient_dashboard')
     else:
         form = HelpRequestForm()
 
-    pending_count = HelpRequest.objects.filter(patient=patient_profile, status='Pending').count()
-    answered_count = HelpRequest.objects.filter(patient=patient_profile, status='Answered').count()
-    past_requests = HelpRequest.objects.filter(patient=patient_profile).order_by('-requested_at')
-    medical_history = PatientMedicalHistory.objects.filter(patient=patient_profile).order_by('-recorded_at')
-
-    context = {
-        'form': form, 'past_requests': past_requests, 'medical_history': medical_history,
-        'pending_count': pending_count, 'answered_count': answered_count,
-        'upcoming_appointments': upcoming_appointments, 'now': now
-    }
-    return render(request, 'patient_dashboard.html', context)
+    context = await aload_patient_dashboard(
+        patient_profile, now,
+        requests_cursor=request.GET.get('requests'),
+        history_cursor=request.GET.get('history'),
+    )
+    context['past_requests'].link(request, 'requests')
+    context['medical_history'].link(request, 'history')
+    context['form'] = form
+    return await concurrency.run(lambda: render(request, 'patient_dashboard.html', context))
 
 @login_required
 @role_required(allowed_roles=['doctor'])
 def request_detail_view(request, request_id):
     help_request = get_object_or_404(HelpRequest, id=request_id)
-    patient_profile = help_request.patient
 
+    # Only evaluated when the cached patient panel has to be re-rendered
     medical_history = PatientMedicalHistory.objects.filter(
-        patient=patient_profile
+        patient_id=help_request.patient_id
     ).order_by('-recorded_at')
     
     past_answered_requests = HelpRequest.objects.filter(
-        patient=patient_profile, 
+        patient_id=help_request.patient_id, 
         status='Answered'
-    ).exclude(id=request_id).order_by('-prescription__prescribed_at')[:5]
+    ).exclude(id=request_id).select_related('prescription').order_by('-prescription__prescribed_at')[:5]
 
     context = {
         'help_request': help_request,
@@ -227,14 +261,19 @@ def request_detail_view(request, request_id):
         if request.method == 'POST':
             form = PrescriptionForm(request.POST)
             if form.is_valid():
-                new_prescription = form.save(commit=False)
-                new_prescription.help_request = help_request
-                new_prescription.save()
-                
-                help_request.status = 'Answered'
-                help_request.doctor = request.user.doctorprofile
-                help_request.save()
-                
+                # The prescription, the status change and the stats and
+                # counters its signals update are saved together or not at all
+                with transaction.atomic():
+                    # Assign the doctor first: the prescription's notification
+                    # names them
+                    help_request.status = 'Answered'
+                    help_request.doctor = request.user.doctorprofile
+                    help_request.save()
+
+                    new_prescription = form.save(commit=False)
+                    new_prescription.help_request = help_request
+                    new_prescription.save()
+
                 messages.success(request, 'Your response has been submitted successfully!')
                 return redirect('doctor_dashboard')
         else:
@@ -247,32 +286,45 @@ def request_detail_view(request, request_id):
 
     return render(request, 'request_detail.html', context)
 
+@login_required
+@role_required(allowed_roles=['doctor'])
+def case_search_view(request):
+    query = request.GET.get('q', '').strip()
+    page = None
+    if query:
+        page = search_cases(request.user.doctorprofile, query, request.GET.get('page'))
+
+    context = {
+        'query': query,
+        'page': page,
+    }
+    return render(request, 'case_search.html', context)
+
 @login_required
 @role_required(allowed_roles=['patient'])
 def quick_help_view(request):
+    # Every step is served from the compiled tree, without touching the database
+    tree = get_quick_help_tree()
     context = {}
 
     if 'option_id' in request.POST:
-        option_id = request.POST.get('option_id')
-
         try:
-            selected_option = SymptomOption.objects.select_related('next_symptom', 'suggestion').get(id=option_id)
-
-            if selected_option.next_symptom:
-                context['question'] = selected_option.next_symptom
-            elif hasattr(selected_option, 'suggestion'):
-                context['suggestion'] = selected_option.suggestion
-            else:
-                messages.error(request, "This path is not configured correctly.")
-                return redirect('quick_help')
-        except SymptomOption.DoesNotExist:
+            selected_option = tree.options[int(request.POST.get('option_id'))]
+        except (KeyError, TypeError, ValueError):
             messages.error(request, "The selected option could not be found.")
             return redirect('quick_help')
+
+        if selected_option.next_symptom_id in tree.questions:
+            context['question'] = tree.questions[selected_option.next_symptom_id]
+        elif selected_option.suggestion:
+            context['suggestion'] = selected_option.suggestion
+        else:
+            messages.error(request, "This path is not configured correctly.")
+            return redirect('quick_help')
     else:
-        try:
-            main_symptom = Symptom.objects.get(name='main_symptom')
-            context['question'] = main_symptom
-        except Symptom.DoesNotExist:
+        if tree.root:
+            context['question'] = tree.root
+        else:
             context['error'] = "The Quick Help system is not configured yet."
 
     return render(request, 'quick_help.html', context)
@@ -283,6 +335,7 @@ def profile_view(request):
     return render(request, 'profile.html')
 
 
+@cache_anonymous_page('index')
 def index_view(request):
     # If the user is already logged in, redirect them to their dashboard
     if request.user.is_authenticated:
@@ -344,18 +397,18 @@ def profile_picture_upload_view(request):
     context = {'form': form}
     return render(request, 'profile_picture_upload.html', context)
 
-login_required
+@login_required
 @role_required(allowed_roles=['doctor'])
 def assign_request_view(request, request_id):
-    # Find the request, ensuring it's still pending
-    help_request = get_object_or_404(HelpRequest, id=request_id, status='Pending')
-    
+    help_request = get_object_or_404(HelpRequest.objects.select_related('patient__user'), id=request_id)
+
     if request.method == 'POST':
-        # Assign the current doctor and update the status
-        help_request.doctor = request.user.doctorprofile
-        help_request.status = 'In Progress'
-        help_request.save()
-        messages.success(request, f"Request from '{help_request.patient.user.username}' has been assigned to you.")
+        # Claimed with a conditional UPDATE: if another doctor got there
+        # first, this one is told instead of silently taking it over
+        if claim_request(help_request.id, request.user.doctorprofile):
+            messages.success(request, f"Request from '{help_request.patient.user.username}' has been assigned to you.")
+        else:
+            messages.error(request, 'This request has already been taken by another doctor.')
         return redirect('doctor_dashboard')
 
     # If it's a GET request, just redirect away
@@ -366,55 +419,79 @@ def assign_request_view(request, request_id):
 def manage_schedule_view(request):
     doctor_profile = request.user.doctorprofile
 
+    form = ScheduleGenerationForm()
+    rule_form = WeeklyScheduleRuleForm()
+    recurring_form = RecurringScheduleGenerationForm(initial={'start_date': timezone.localdate()})
+
     if request.method == 'POST':
-        form = ScheduleGenerationForm(request.POST)
-        if form.is_valid():
-            date = form.cleaned_data['date']
-            start_time = form.cleaned_data['start_time']
-            end_time = form.cleaned_data['end_time']
-
-            current_slot_start_naive = datetime.combine(date, start_time)
-            final_slot_end_naive = datetime.combine(date, end_time)
-
-            current_slot_start = timezone.make_aware(current_slot_start_naive)
-            final_slot_end = timezone.make_aware(final_slot_end_naive)
-
-            while current_slot_start < final_slot_end:
-                current_slot_end = current_slot_start + timedelta(minutes=30)
-                if current_slot_end > final_slot_end:
-                    break
-                TimeSlot.objects.create(
-                    doctor=doctor_profile,
-                    start_time=current_slot_start,
-                    end_time=current_slot_end
+        # Check which form was submitted using the button's 'name' attribute
+        if 'rule_form' in request.POST:
+            rule_form = WeeklyScheduleRuleForm(request.POST)
+            if rule_form.is_valid():
+                rule = rule_form.save(commit=False)
+                rule.doctor = doctor_profile
+                rule.save()
+                messages.success(request, f"Added weekly availability for {rule.get_weekday_display()}.")
+                return redirect('manage_schedule')
+            messages.error(request, 'There was an error in your weekly rule. Please check the details.')
+
+        elif 'delete_rule' in request.POST:
+            WeeklyScheduleRule.objects.filter(id=request.POST.get('delete_rule'), doctor=doctor_profile).delete()
+            messages.success(request, 'Weekly availability rule removed.')
+            return redirect('manage_schedule')
+
+        elif 'recurring_form' in request.POST:
+            recurring_form = RecurringScheduleGenerationForm(request.POST)
+            if recurring_form.is_valid():
+                slots = slots_from_rules(
+                    doctor_profile.schedule_rules.all(),
+                    recurring_form.cleaned_data['start_date'],
+                    recurring_form.cleaned_data['weeks'],
                 )
-                current_slot_start = current_slot_end
+                created, skipped = save_slots(slots)
+                messages.success(request, f'Created {created} time slots from your weekly schedule ({skipped} skipped due to conflicts).')
+                return redirect('manage_schedule')
+            messages.error(request, 'There was an error in your form submission. Please check the details.')
 
-            messages.success(request, 'Your schedule has been updated with the new time slots!')
-            return redirect('manage_schedule')
         else:
+            form = ScheduleGenerationForm(request.POST)
+            if form.is_valid():
+                slots = slots_for_day(
+                    doctor_profile.pk,
+                    form.cleaned_data['date'],
+                    form.cleaned_data['start_time'],
+                    form.cleaned_data['end_time'],
+                )
+                created, skipped = save_slots(slots)
+                if skipped:
+                    messages.success(request, f'Your schedule has been updated with {created} new time slots ({skipped} overlapped existing slots and were skipped).')
+                else:
+                    messages.success(request, 'Your schedule has been updated with the new time slots!')
+                return redirect('manage_schedule')
             messages.error(request, 'There was an error in your form submission. Please check the details.')
-    else:
-        form = ScheduleGenerationForm()
 
     
     now = timezone.localtime()
     today = now.date()
     start_of_week = today - timedelta(days=today.weekday())
     end_of_week = start_of_week + timedelta(days=6)
+    # Compare start_time against the week's bounds directly rather than
+    # through __date, which wraps the column and can't use its index
+    week_start = timezone.make_aware(datetime.combine(start_of_week, time.min))
+    week_end = timezone.make_aware(datetime.combine(end_of_week + timedelta(days=1), time.min))
 
     # Query 1: Get all upcoming slots for the week
     upcoming_slots = TimeSlot.objects.filter(
         doctor=doctor_profile,
-        start_time__date__range=[start_of_week, end_of_week],
-        start_time__gte=now  # The slot must be in the future
+        start_time__gte=max(now, week_start),  # The slot must be in the future
+        start_time__lt=week_end,
     ).order_by('start_time')
 
     # Query 2: Get all past slots for the week
     past_slots = TimeSlot.objects.filter(
         doctor=doctor_profile,
-        start_time__date__range=[start_of_week, end_of_week],
-        start_time__lt=now  # The slot must be in the past
+        start_time__gte=week_start,
+        start_time__lt=min(now, week_end),  # The slot must be in the past
     ).order_by('-start_time')
 
     # Update the context to send the new variables to the template
@@ -422,6 +499,9 @@ def manage_schedule_view(request):
         'form': form,
         'upcoming_slots': upcoming_slots,
         'past_slots': past_slots,
+        'rule_form': rule_form,
+        'recurring_form': recurring_form,
+        'schedule_rules': doctor_profile.schedule_rules.all(),
         'current_week': f"{start_of_week.strftime('%b %d')} - {end_of_week.strftime('%b %d, %Y')}"
     }
     return render(request, 'manage_schedule.html', context)
@@ -429,9 +509,10 @@ def manage_schedule_view(request):
 @login_required
 @role_required(allowed_roles=['patient'])
 def doctor_list_view(request):
-    doctors = DoctorProfile.objects.all()
+    doctors = DoctorProfile.objects.select_related('user')
     context = {
         'doctors': doctors,
+        'specialties': [name for name, _ in DoctorProfile.SPECIALTY_CHOICES],
     }
     return render(request, 'doctor_list.html', context)
 
@@ -440,31 +521,15 @@ def doctor_list_view(request):
 @login_required
 @role_required(allowed_roles=['patient'])
 def doctor_schedule_view(request, doctor_id):
-    doctor = get_object_or_404(DoctorProfile, user_id=doctor_id)
+    doctor = get_object_or_404(DoctorProfile.objects.select_related('user'), user_id=doctor_id)
     today = timezone.localtime()
 
-    # --- TEMPORARY DEBUGGING ---
-    print("=============================================")
-    print(f"DEBUGGING SCHEDULE for Dr. {doctor.user.username}")
-    print(f"Current Time Used for Filtering: {today}")
-
-    # Step 1: Get ALL slots for this doctor, even past or booked ones
-    all_slots_for_doctor = TimeSlot.objects.filter(doctor=doctor)
-    print(f"Total slots found for this doctor (any status): {all_slots_for_doctor.count()}")
-
-    # Step 2: Print details of a few slots to check their data
-    for slot in all_slots_for_doctor.order_by('start_time')[:3]: # Check the first 3
-        print(f"  - Slot ID {slot.id}: Starts at {slot.start_time}, Is Booked? {slot.is_booked}")
-
-    # Step 3: Run the actual query the page uses
     available_slots = TimeSlot.objects.filter(
+        not_held_by_others(request.user.patientprofile, today),
         doctor=doctor,
         start_time__gte=today,
         is_booked=False
     ).order_by('start_time')
-    print(f"Slots visible to patient after filtering: {available_slots.count()}")
-    print("=============================================")
-    # --- END DEBUGGING ---
 
     context = {
         'doctor': doctor,
@@ -472,33 +537,93 @@ def doctor_schedule_view(request, doctor_id):
     }
     return render(request, 'doctor_schedule.html', context)
 
+@login_required
+@role_required(allowed_roles=['patient'])
+def slot_search_view(request):
+    """
+    JSON API: the earliest open slots across all doctors of a specialty.
+
+    Query parameters: specialty (required), date_from / date_to (YYYY-MM-DD,
+    default today and the following 14 days), time_from / time_to (HH:MM),
+    limit (1-100, default 20) and cursor (the next_cursor of a previous page).
+    """
+    specialty = request.GET.get('specialty', '')
+    if specialty not in dict(DoctorProfile.SPECIALTY_CHOICES):
+        return JsonResponse({'error': 'Unknown or missing specialty.'}, status=400)
+
+    try:
+        date_from = date.fromisoformat(request.GET['date_from']) if request.GET.get('date_from') else timezone.localdate()
+        date_to = date.fromisoformat(request.GET['date_to']) if request.GET.get('date_to') else date_from + timedelta(days=14)
+        time_from = time.fromisoformat(request.GET['time_from']) if request.GET.get('time_from') else None
+        time_to = time.fromisoformat(request.GET['time_to']) if request.GET.get('time_to') else None
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date, time or limit.'}, status=400)
+
+    after = None
+    if request.GET.get('cursor'):
+        cursor = decode_cursor(request.GET['cursor'])
+        try:
+            after = (datetime.fromisoformat(cursor[0]), int(cursor[1]))
+        except (TypeError, ValueError, IndexError):
+            return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+    # Never offer slots that have already started
+    window_start = max(timezone.make_aware(datetime.combine(date_from, time.min)), timezone.now())
+    window_end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+
+    slots = search_open_slots(
+        specialty, window_start, window_end, time_from, time_to,
+        after=after, limit=limit, exclude_held_for=request.user.patientprofile,
+    )
+
+    results = [{
+        'id': slot.id,
+        'doctor_id': slot.doctor_id,
+        'doctor_name': f"Dr. {slot.doctor.user.get_full_name() or slot.doctor.user.username}",
+        'start_time': slot.start_time.isoformat(),
+        'end_time': slot.end_time.isoformat(),
+        'book_url': reverse('book_appointment', args=[slot.id]),
+    } for slot in slots]
+    next_cursor = encode_cursor([slots[-1].start_time.isoformat(), slots[-1].id]) if len(slots) == limit else None
+
+    return JsonResponse({'results': results, 'next_cursor': next_cursor})
+
 @login_required
 @role_required(allowed_roles=['patient'])
 def book_appointment_view(request, slot_id):
-    timeslot = get_object_or_404(TimeSlot, id=slot_id, is_booked=False)
+    timeslot = get_object_or_404(TimeSlot.objects.select_related('doctor__user'), id=slot_id, is_booked=False)
     patient_profile = request.user.patientprofile
 
+    if request.method == 'POST' and 'cancel' in request.POST:
+        # Free the slot now instead of when the hold expires
+        release_hold(timeslot.id, patient_profile)
+        return redirect('doctor_schedule', doctor_id=timeslot.doctor_id)
+
     if request.method == 'POST':
         form = AppointmentBookingForm(request.POST)
         if form.is_valid():
-            # Create the appointment, but don't save yet
-            appointment = form.save(commit=False)
-            appointment.patient = patient_profile
-            appointment.timeslot = timeslot
-            appointment.save()
-            
-            # Mark the timeslot as booked
-            timeslot.is_booked = True
-            timeslot.save()
-            
+            # Claim the slot and create the appointment in one atomic step
+            appointment = book_slot(timeslot.id, patient_profile, form.save(commit=False))
+            if appointment is None:
+                messages.error(request, "Sorry, this time slot was just booked by someone else. Please pick another one.")
+                return redirect('doctor_schedule', doctor_id=timeslot.doctor_id)
+
             messages.success(request, f"Your appointment has been booked successfully!")
             return redirect('appointment_history') # Redirect to history to see the new booking
     else:
+        # Hold the slot while the patient fills in the reason. Showing the
+        # page is enough to place it; leaving other than through Cancel
+        # keeps the slot held until the hold expires.
+        if not hold_slot(timeslot.id, patient_profile):
+            messages.error(request, "This time slot is currently being booked by another patient. Please pick another one.")
+            return redirect('doctor_schedule', doctor_id=timeslot.doctor_id)
         form = AppointmentBookingForm()
 
     context = {
         'form': form,
         'timeslot': timeslot,
+        'hold_minutes': hold_seconds() // 60,
     }
     return render(request, 'book_appointment.html', context)
 
@@ -509,9 +634,11 @@ def appointment_detail_view(request, appointment_id):
     patient_profile = appointment.patient
     now = timezone.localtime()
 
-    # Fetch patient's history for context
-    medical_history = PatientMedicalHistory.objects.filter(patient=patient_profile).order_by('-recorded_at')
-    past_answered_requests = HelpRequest.objects.filter(patient=patient_profile, status='Answered').order_by('-prescription__prescribed_at')[:5]
+    # Fetch patient's history for context (only evaluated when the cached
+    # history panel has to be re-rendered)
+    medical_history = PatientMedicalHistory.objects.filter(patient_id=appointment.patient_id).order_by('-recorded_at')
+    past_answered_requests = (HelpRequest.objects.filter(patient_id=appointment.patient_id, status='Answered')
+                              .select_related('prescription').order_by('-prescription__prescribed_at')[:5])
 
     # Initialize both forms
     notes_form = AppointmentNotesForm(instance=appointment)
@@ -524,7 +651,8 @@ def appointment_detail_view(request, appointment_id):
             if notes_form.is_valid():
                 consultation = notes_form.save(commit=False)
                 consultation.status = 'Completed'
-                consultation.save()
+                with transaction.atomic():
+                    consultation.save()
                 messages.success(request, "Consultation notes have been saved.")
                 return redirect('doctor_dashboard')
         
@@ -556,10 +684,12 @@ def appointment_detail_view(request, appointment_id):
 def appointment_history_view(request):
     patient_profile = request.user.patientprofile
     
-    # Fetch all appointments for the patient, both past and future
-    appointments = Appointment.objects.filter(
-        patient=patient_profile
-    ).order_by('-timeslot__start_time') # Show most recent first
+    # All appointments for the patient, both past and future, most recent first
+    appointments = paginate(
+        Appointment.objects.filter(patient=patient_profile).select_related('timeslot__doctor__user'),
+        ('-timeslot__start_time', '-id'),
+        request.GET.get('cursor'),
+    ).link(request, 'cursor')
 
     context = {
         'appointments': appointments,
@@ -594,7 +724,31 @@ def consultation_room_view(request, appointment_id):
 def mark_notification_as_read(request, notification_id):
     notification = get_object_or_404(Notification, id=notification_id, user=request.user)
     notification.is_read = True
-    notification.save()
+    notification.save(update_fields=['is_read'])
     
     # Redirect to the original link stored in the notification
-    return redirect(notification.link)
\ No newline at end of file
+    return redirect(notification.link)
+
+@login_required
+def mark_all_notifications_as_read(request):
+    if request.method == 'POST':
+        updated = mark_all_as_read(request.user.pk)
+        messages.success(request, f"Marked {updated} notification(s) as read.")
+
+    # Send the user back to the page they were on, if it's one of ours
+    referer = request.META.get('HTTP_REFERER')
+    if url_has_allowed_host_and_scheme(referer, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        return redirect(referer)
+    return redirect('index')
+
+@login_required
+def media_view(request, path):
+    """
+    Serves uploads (attachments, profile pictures and their variants) to
+    the users allowed to see them. Unknown and forbidden files both get a
+    404 so the response doesn't reveal which files exist.
+    """
+    path = media.clean_path(path)
+    if path is None or not media.can_access(request.user, path):
+        raise Http404('No such file.')
+    return media.serve(request, path)
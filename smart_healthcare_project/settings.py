@@ -11,24 +11,42 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+from urllib.parse import unquote, urlsplit
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+TRUTHY = ('1', 'true', 'yes')
+
+# Settings profile, chosen with DJANGO_ENV:
+#   local      - SQLite and in-process cache/channels; runs with no services
+#   test       - local plus fast password hashing and no env-driven extras
+#   production - PostgreSQL through a connection pool, Redis, no debug
+# docker-compose and render.yaml select production.
+SETTINGS_PROFILE = os.getenv('DJANGO_ENV', 'local')
+if SETTINGS_PROFILE not in ('local', 'test', 'production'):
+    raise ImproperlyConfigured(f"DJANGO_ENV must be local, test or production, not {SETTINGS_PROFILE!r}.")
+PRODUCTION = SETTINGS_PROFILE == 'production'
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('SECRET_KEY')
+if not SECRET_KEY:
+    if PRODUCTION:
+        raise ImproperlyConfigured('SECRET_KEY must be set in production.')
+    SECRET_KEY = 'django-insecure-local-development-key'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', str(SETTINGS_PROFILE == 'local')).lower() in TRUTHY
 
-ALLOWED_HOSTS = ['*']
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '*').split(',')
 
 
 # Application definition
@@ -46,6 +64,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'healthcare_app.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +93,17 @@ TEMPLATES = [
     },
 ]
 
+if PRODUCTION:
+    # Compile each template once per process. (Set explicitly, as the
+    # loaders option can't be combined with APP_DIRS.)
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'smart_healthcare_project.wsgi.application'
 
 
@@ -82,19 +112,69 @@ WSGI_APPLICATION = 'smart_healthcare_project.wsgi.application'
 
 # In settings.py
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('POSTGRES_DB'),
-        'USER': os.getenv('POSTGRES_USER'),
-        'PASSWORD': os.getenv('DATABASE_PASSWORD'),
-        'HOST': 'db',
-        'PORT': '5432',
+if PRODUCTION:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB'),
+            'USER': os.getenv('POSTGRES_USER'),
+            'PASSWORD': os.getenv('DATABASE_PASSWORD', os.getenv('POSTGRES_PASSWORD')),
+            'HOST': os.getenv('POSTGRES_HOST', 'db'),
+            'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        }
+    }
+    # Render hands the database over as one URL
+    if os.getenv('DATABASE_URL'):
+        url = urlsplit(os.getenv('DATABASE_URL'))
+        DATABASES['default'].update({
+            'NAME': url.path.lstrip('/'),
+            'USER': unquote(url.username or ''),
+            'PASSWORD': unquote(url.password or ''),
+            'HOST': url.hostname,
+            'PORT': str(url.port or 5432),
+        })
+
+    if os.getenv('DB_POOL', '1').lower() in TRUTHY:
+        from psycopg_pool import ConnectionPool
+        # Connections are opened ahead of time and shared by every request
+        # and async worker thread of the process, so no request pays for a
+        # connect. Pool wait times are shown on the admin profiling page.
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+                # Seconds a request may wait for a free connection
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                # Replace connections that died while idle in the pool
+                'check': ConnectionPool.check_connection,
+            },
+        }
+    else:
+        # Behind an external pooler (e.g. PgBouncer): keep each worker's
+        # connection open and check it before reuse instead.
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', 60))
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
     }
-}
 # In smart_healthcare_project/settings.py
 AUTH_USER_MODEL = 'healthcare_app.User'
 
+# The user behind each request is loaded through the cache (see
+# healthcare_app/auth_cache.py). The subclass replaces ModelBackend rather
+# than sitting in front of it: a second backend would check every failed
+# login's password again.
+AUTHENTICATION_BACKENDS = [
+    'healthcare_app.backends.CachedModelBackend',
+]
+# Seconds a resolved user (with role and profile) is cached; saving the
+# user or their profile drops the copy straight away. 0 disables caching.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', 300))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -134,6 +214,11 @@ STATIC_URL = 'static/'
 # The absolute path to the directory where collectstatic will collect static files for deployment.
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Outside debug mode Django doesn't serve static files itself. Nothing sits
+# in front of Daphne in docker-compose or on Render, so the collected files
+# are served by the app unless this is turned off (e.g. behind nginx).
+SERVE_STATIC = os.getenv('SERVE_STATIC', '1').lower() in TRUTHY
+
 # Directories where Django will look for static files in addition to each app's static directory.
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
@@ -153,12 +238,81 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Tell Django to use the Channels ASGI application
 ASGI_APPLICATION = 'smart_healthcare_project.asgi.application'
 
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels_redis.core.RedisChannelLayer',
-        'CONFIG': {
-            "hosts": [("redis", 6379)], # Connects to your running Memurai/Redis
+if PRODUCTION or os.getenv('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                "hosts": [os.getenv('REDIS_URL', 'redis://redis:6379/0')], # Connects to your running Memurai/Redis
+            },
         },
-    },
-}
+    }
+else:
+    # Chat and notifications within a single process, no Redis needed
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
+# Shared cache for sessions, users, notifications and page fragments. Set
+# REDIS_URL (e.g. redis://redis:6379/1) in production so every worker sees
+# the same entries; without it each process keeps its own in-memory cache.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
 
+# Sessions are read from the cache and written through to the database, so
+# they survive a cache flush.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# How long (in seconds) a time slot stays reserved for a patient while they
+# fill in the booking form. Set to 0 to disable holds.
+SLOT_HOLD_SECONDS = int(os.getenv('SLOT_HOLD_SECONDS', 300))
+
+# Assign each new help request straight to the least-loaded doctor of its
+# specialty instead of leaving it in the shared Pending queue.
+AUTO_ASSIGN_REQUESTS = os.getenv('AUTO_ASSIGN_REQUESTS', '').lower() in TRUTHY
+
+# Let the async dashboards run their independent queries at the same time,
+# each on a worker thread with its own database connection. On by default
+# in production, where connections come from the pool; with a new
+# connection per query the connects cost more than the overlap saves.
+CONCURRENT_QUERIES = os.getenv('CONCURRENT_QUERIES', str(PRODUCTION)).lower() in TRUTHY
+
+# Threads that resize uploaded images in the background. Set to 0 to
+# process uploads inline (e.g. in tests).
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+
+# Uploads are served through healthcare_app's media view, which checks who
+# is asking. Behind nginx, set this to an `internal` location aliased to
+# MEDIA_ROOT (e.g. '/protected-media/') and the view only authorizes, then
+# hands the transfer off with an X-Accel-Redirect header.
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', '')
+
+# Fraction of requests (0-1) to profile: sampled responses carry a
+# Server-Timing header and feed the per-URL summary on the admin profiling
+# page. 0 turns profiling off; a small rate is cheap enough for production.
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+# Samples kept per URL name for that summary
+PROFILING_WINDOW = int(os.getenv('PROFILING_WINDOW', 500))
+
+if SETTINGS_PROFILE == 'test':
+    # Tests build their own data and must not depend on the environment
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    AUTO_ASSIGN_REQUESTS = False
+    CONCURRENT_QUERIES = False
+    PROFILING_SAMPLE_RATE = 0
+    IMAGE_WORKERS = 0
@@ -1,7 +1,7 @@
-from django.contrib import admin
-from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from django.contrib import admin
+from django.urls import path, include, re_path
+from django.views.static import serve
 
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 
@@ -10,9 +10,10 @@ urlpatterns = [
     path('', include('healthcare_app.urls')), 
 ]
 
-# This tells Django to serve media files (user uploads) during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
 # This tells Django to serve the admin's static files during development
-urlpatterns += staticfiles_urlpatterns()
\ No newline at end of file
+if settings.DEBUG:
+    urlpatterns += staticfiles_urlpatterns()
+elif settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(rf"^{settings.STATIC_URL.strip('/')}/(?P<path>.*)$", serve, {'document_root': settings.STATIC_ROOT}),
+    ]
\ No newline at end of file